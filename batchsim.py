@@ -0,0 +1,200 @@
+import argparse
+import time
+
+import numpy as np
+
+from bots import generate_fleets
+from common import PlayerBoard, GRID_SIZE, SHIP_SIZES, placements_for
+from engine import GameResult, summarize
+
+# Vectorized random-vs-random simulator. Needs NumPy (pip install numpy).
+#
+# K games are held as arrays indexed [game, player, ...]:
+#   ship_ids[k, p, cell]  ship index at each cell of player p's board, -1 for water
+#   health[k, p, ship]    cells of each ship not yet hit
+#   orders[k, p, i]       the i-th cell player p fires at (a random permutation)
+# Every step fires one shot in every unfinished game and resolves it the
+# way PlayerBoard.receive_shot does: Hit, Sunk on the ship's last cell,
+# otherwise Miss. A hit keeps the turn and a miss passes it, as in PvE.
+
+
+# --- Fleet Placement ---
+REDRAW_LIMIT = 100  # Times a ship is redrawn on a board where it overlaps before bots.generate_fleets fills that board
+
+
+def placement_table(size, grid_size=GRID_SIZE):
+    """The shared placement index for one ship as an int array of cells [n, size], plus the index itself."""
+    placements = placements_for(size, grid_size)
+    return np.array([placement.cells for placement in placements], dtype=np.int16), placements
+
+
+def place_fleets(rng, games, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES):
+    """Places a random fleet on `games` boards at once.
+
+    Ships go down in order, each drawn uniformly from the in-bounds
+    placements and redrawn only on boards where it overlaps an earlier
+    ship. That is the plain sequential draw, not the largest-first search
+    with backtracking of bots.random_fleet. A board where a ship still
+    overlaps after REDRAW_LIMIT redraws, which only dense fleets run into,
+    gets its whole fleet from bots.generate_fleets instead, which raises
+    ValueError for a fleet that cannot fit. Returns ship_ids [games, cells]
+    and the chosen placement index per ship.
+    """
+    ship_ids = np.full((games, grid_size * grid_size), -1, dtype=np.int8)
+    chosen = np.empty((games, len(ship_sizes)), dtype=np.int32)
+    active = np.arange(games)
+
+    for ship, size in enumerate(ship_sizes):
+        cells, spots = placement_table(size, grid_size)
+        pending = active
+        for _ in range(REDRAW_LIMIT):
+            if not pending.size:
+                break
+            picks = rng.integers(0, len(cells), size=pending.size)
+            overlaps = (ship_ids[pending[:, None], cells[picks]] >= 0).any(axis=1)
+            placed, picks = pending[~overlaps], picks[~overlaps]
+            ship_ids[placed[:, None], cells[picks]] = ship
+            chosen[placed, ship] = picks
+            pending = pending[overlaps]
+        if pending.size:
+            active = np.setdiff1d(active, pending)  # Placed whole below
+
+    stuck = np.setdiff1d(np.arange(games), active)
+    if stuck.size:
+        spot_index = {size: {placement: i for i, placement in enumerate(placement_table(size, grid_size)[1])}
+                      for size in set(ship_sizes)}
+        fleets = generate_fleets(stuck.size, ship_sizes, grid_size, seed=int(rng.integers(1 << 62)))
+        for game, fleet in zip(stuck, fleets):
+            ship_ids[game] = -1
+            for ship, (size, placement) in enumerate(zip(ship_sizes, fleet)):
+                ship_ids[game, list(placement.cells)] = ship
+                chosen[game, ship] = spot_index[size][placement]
+    return ship_ids, chosen
+
+
+# --- Batch Game Loop ---
+def play_batch(games, seed=0, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES):
+    """Plays `games` random-vs-random games in lockstep. Returns a dict of result arrays.
+
+    Even games let player 0 fire first, odd games player 1, like engine.play_games.
+    """
+    rng = np.random.default_rng(seed)
+    n_cells = grid_size * grid_size
+    n_ships = len(ship_sizes)
+
+    fleets = [place_fleets(rng, games, grid_size, ship_sizes) for _ in range(2)]
+    ship_ids = np.stack([fleet[0] for fleet in fleets], axis=1)
+    placements = np.stack([fleet[1] for fleet in fleets], axis=1)
+    orders = rng.random((games, 2, n_cells)).argsort(axis=2).astype(np.int16)
+
+    # The loop works on flat views; "player slot" p = game * 2 + player
+    ship_flat = ship_ids.reshape(-1)
+    order_flat = orders.reshape(-1)
+    health = np.tile(np.array(ship_sizes, dtype=np.int16), games * 2)
+    sunk = np.zeros(games * 2, dtype=np.int16)
+    fired = np.zeros(games * 2, dtype=np.int16)
+    first = (np.arange(games) % 2).astype(np.int8)
+    winner = np.full(games, -1, dtype=np.int8)
+
+    attacker = np.arange(games, dtype=np.int64) * 2 + first  # Slot of each live game's attacker
+    while attacker.size:
+        shots = fired[attacker]
+        fired[attacker] = shots + 1
+        cell = order_flat[attacker * n_cells + shots]
+        defender = attacker ^ 1
+        ship = ship_flat[defender * n_cells + cell]
+
+        hit = ship >= 0
+        hit_slot = defender[hit]
+        target = hit_slot * n_ships + ship[hit]
+        left = health[target] - 1
+        health[target] = left
+        attacker[~hit] ^= 1  # A miss passes the turn
+
+        sank = hit_slot[left == 0]
+        if sank.size:
+            sunk[sank] += 1
+            won = sank[sunk[sank] == n_ships] ^ 1
+            if won.size:
+                winner[won // 2] = won % 2
+                attacker = attacker[winner[attacker // 2] < 0]
+
+    fired = fired.reshape(games, 2)
+    return {
+        'winner': winner,
+        'shots': fired[np.arange(games), winner],
+        'first': first,
+        'fired': fired,
+        'placements': placements,
+        'orders': orders,
+    }
+
+
+# --- Scalar Cross-Check ---
+def replay_scalar(batch, game, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES):
+    """Replays one game of a batch through PlayerBoard and returns (winner, shots fired by each)."""
+    tables = [placement_table(size, grid_size)[1] for size in ship_sizes]
+    boards = [PlayerBoard("A", grid_size), PlayerBoard("B", grid_size)]
+    for player, board in enumerate(boards):
+        for ship, size in enumerate(ship_sizes):
+            placement = tables[ship][batch['placements'][game, player, ship]]
+            board.add_ship(size, placement.col, placement.row, placement.orientation)
+
+    fired = [0, 0]
+    attacker = int(batch['first'][game])
+    while True:
+        defender = 1 - attacker
+        cell = int(batch['orders'][game, attacker, fired[attacker]])
+        fired[attacker] += 1
+        result, is_sunk = boards[defender].receive_shot(cell % grid_size, cell // grid_size)
+        if boards[defender].all_ships_sunk():
+            return attacker, fired
+        if result == 'Miss':
+            attacker = defender
+
+
+def cross_check(games=1000, seed=0, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES):
+    """Checks a vectorized batch against the scalar rules. Returns the number of mismatching games."""
+    batch = play_batch(games, seed, grid_size, ship_sizes)
+    mismatches = 0
+    for game in range(games):
+        winner, fired = replay_scalar(batch, game, grid_size, ship_sizes)
+        if winner != batch['winner'][game] or fired != batch['fired'][game].tolist():
+            mismatches += 1
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate random-vs-random Battleship games with NumPy.")
+    parser.add_argument('-n', '--games', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=100000, help="Games held in memory at once.")
+    parser.add_argument('--seed', type=int, default=0, help="Batch i uses seed + i.")
+    parser.add_argument('--grid-size', type=int, default=GRID_SIZE)
+    parser.add_argument('--ships', type=int, nargs='+', default=SHIP_SIZES, help="Fleet ship sizes.")
+    parser.add_argument('--check', type=int, default=1000,
+                        help="Games to replay through PlayerBoard before the run (0 skips).")
+    args = parser.parse_args()
+
+    if args.check:
+        mismatches = cross_check(args.check, args.seed, args.grid_size, args.ships)
+        print(f"Cross-check vs PlayerBoard: {args.check - mismatches}/{args.check} games identical")
+        if mismatches:
+            raise SystemExit(1)
+
+    winners, shots, firsts = [], [], []
+    start = time.perf_counter()
+    for i, offset in enumerate(range(0, args.games, args.batch_size)):
+        batch = play_batch(min(args.batch_size, args.games - offset), args.seed + i, args.grid_size, args.ships)
+        winners.append(batch['winner'])
+        shots.append(batch['shots'])
+        firsts.append(batch['first'])
+    elapsed = time.perf_counter() - start
+
+    results = [GameResult(*result) for result in zip(np.concatenate(winners).tolist(),
+                                                     np.concatenate(shots).tolist(),
+                                                     np.concatenate(firsts).tolist())]
+    print(summarize(results, 'random', 'random', elapsed))
+
+
+if __name__ == "__main__":
+    main()
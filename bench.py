@@ -0,0 +1,323 @@
+import argparse
+import json
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from bots import STRATEGIES, random_fleet
+from common import (
+    PlayerBoard, GRID_SIZE, SHIP_SIZES, FrameDecoder, PROTOCOL_JSON, PROTOCOL_BINARY, encode_message,
+    decode_message, pack_fleet, validate_fleet
+)
+from metrics import ServerMetrics
+from server import SendLimits, SocketConnection, WriteBatch
+
+# Micro-benchmarks for the hot paths in common.py, bots.py and the wire codec.
+#
+# Each benchmark is a function (grid_size, ship_sizes, rng) -> (setup, run).
+# setup() builds fresh state outside the timed region; run(state) does the
+# work and returns how many operations it performed. A result is the best
+# time per operation over --repeat runs, in nanoseconds.
+
+
+def scaled_fleet(grid_size):
+    """The standard fleet, repeated so it covers the same share of a bigger board."""
+    return SHIP_SIZES * max(1, (grid_size // GRID_SIZE) ** 2)
+
+
+def placed_board(grid_size, ship_sizes, rng):
+    board = PlayerBoard("Bench", grid_size)
+    for size, placement in zip(ship_sizes, random_fleet(ship_sizes, grid_size, rng)):
+        board.add_ship(size, placement.col, placement.row, placement.orientation)
+    return board
+
+
+# --- Board Benchmarks ---
+def bench_add_ship(grid_size, ship_sizes, rng, boards=50):
+    fleets = [random_fleet(ship_sizes, grid_size, rng) for _ in range(boards)]
+
+    def setup():
+        return [PlayerBoard("Bench", grid_size) for _ in range(boards)]
+
+    def run(empty_boards):
+        for board, fleet in zip(empty_boards, fleets):
+            for size, placement in zip(ship_sizes, fleet):
+                board.add_ship(size, placement.col, placement.row, placement.orientation)
+        return boards * len(ship_sizes)
+    return setup, run
+
+
+def bench_is_valid_placement(grid_size, ship_sizes, rng, queries=20000):
+    board = placed_board(grid_size, ship_sizes, rng)
+    checks = [(rng.choice(ship_sizes), rng.randrange(grid_size), rng.randrange(grid_size), rng.choice('HV'))
+              for _ in range(queries)]
+
+    def run(_):
+        is_valid = board.is_valid_placement
+        for size, col, row, orientation in checks:
+            is_valid(size, col, row, orientation)
+        return queries
+    return lambda: None, run
+
+
+def bench_receive_shot(grid_size, ship_sizes, rng, boards=10):
+    fleets = [random_fleet(ship_sizes, grid_size, rng) for _ in range(boards)]
+    order = [(cell % grid_size, cell // grid_size) for cell in range(grid_size * grid_size)]
+    rng.shuffle(order)
+
+    def setup():
+        fresh = []
+        for fleet in fleets:
+            board = PlayerBoard("Bench", grid_size)
+            for size, placement in zip(ship_sizes, fleet):
+                board.add_ship(size, placement.col, placement.row, placement.orientation)
+            fresh.append(board)
+        return fresh
+
+    def run(fresh):
+        for board in fresh:
+            for col, row in order:
+                board.receive_shot(col, row)
+        return boards * len(order)
+    return setup, run
+
+
+def bench_place_fleet(grid_size, ship_sizes, rng, fleets=None, uniform=False):
+    fleets = fleets or max(5, 20000 // (grid_size * grid_size))
+
+    def run(_):
+        for _ in range(fleets):
+            random_fleet(ship_sizes, grid_size, rng, uniform=uniform)
+        return fleets
+    return lambda: None, run
+
+
+def bench_place_fleet_uniform(grid_size, ship_sizes, rng):
+    return bench_place_fleet(grid_size, ship_sizes, rng, fleets=20, uniform=True)
+
+
+def bench_validate_fleet(grid_size, ship_sizes, rng, fleets=2000):
+    """Times the server's PLACEMENT_DONE check over a mix of legal fleets and fleets with one bad ship."""
+    messages = []
+    for i in range(fleets):
+        fleet = [[size, placement.col, placement.row, placement.orientation]
+                 for size, placement in zip(ship_sizes, random_fleet(ship_sizes, grid_size, rng))]
+        if i % 4 == 0:
+            fleet[-1][1] = fleet[0][1]  # Usually an overlap or off the board
+            fleet[-1][2] = fleet[0][2]
+        messages.append(fleet)
+
+    def run(_):
+        for fleet in messages:
+            validate_fleet(fleet, ship_sizes, grid_size)
+        return fleets
+    return lambda: None, run
+
+
+# --- Bot Benchmarks ---
+def bench_bot(strategy):
+    """Times choose_shot plus record_result over whole games against a placed fleet."""
+    def bench(grid_size, ship_sizes, rng, games=3):
+        def setup():
+            return [(STRATEGIES[strategy](grid_size, ship_sizes, rng), PlayerBoard("Bot", grid_size),
+                     placed_board(grid_size, ship_sizes, rng)) for _ in range(games)]
+
+        def run(matches):
+            shots = 0
+            for bot, own, target in matches:
+                while not target.all_ships_sunk():
+                    col, row = bot.choose_shot(own)
+                    result, is_sunk = target.receive_shot(col, row)
+                    own.record_shot(col, row, result)
+                    bot.record_result(col, row, result)
+                    shots += 1
+            return shots
+        return setup, run
+    return bench
+
+
+# --- Codec Benchmarks ---
+def sample_messages(grid_size, ship_sizes, rng):
+    board = placed_board(grid_size, ship_sizes, rng)
+    col, row = rng.randrange(grid_size), rng.randrange(grid_size)
+    return [
+        {"type": "SHOT", "col": col, "row": row},
+        {"type": "SHOT_RESULT", "col": col, "row": row, "result": "Hit", "sunk_count": 1},
+        {"type": "YOUR_TURN"},
+        {"type": "PLACEMENT_DONE", "fleet": pack_fleet(board.ships)},
+    ]
+
+
+def bench_encode(protocol):
+    def bench(grid_size, ship_sizes, rng, rounds=500):
+        messages = sample_messages(grid_size, ship_sizes, rng)
+
+        def run(_):
+            for _ in range(rounds):
+                for message in messages:
+                    encode_message(message, protocol)
+            return rounds * len(messages)
+        return lambda: None, run
+    return bench
+
+
+def bench_decode(protocol):
+    def bench(grid_size, ship_sizes, rng, rounds=500):
+        decoder = FrameDecoder()
+        for message in sample_messages(grid_size, ship_sizes, rng):
+            decoder.feed(encode_message(message, protocol))
+        payloads = [bytes(payload) for payload in decoder.frames()]
+
+        def run(_):
+            for _ in range(rounds):
+                for payload in payloads:
+                    decode_message(payload)
+            return rounds * len(payloads)
+        return lambda: None, run
+    return bench
+
+
+def bench_connection_send(protocol, batched):
+    """Times the server's send path over a local socket pair: a miss's result and turn messages to one player.
+
+    Unbatched, each message is its own send; batched, the pair goes out
+    in one write, as dispatch_frames sends it. Time is per message.
+    """
+    def bench(grid_size, ship_sizes, rng, rounds=200):
+        col, row = rng.randrange(grid_size), rng.randrange(grid_size)
+        turn = [{"type": "SHOT_RESULT", "col": col, "row": row, "result": "Miss", "sunk_count": 1},
+                {"type": "OPPONENT_TURN"}]
+
+        def setup():
+            return socket.socketpair()
+
+        def run(pair):
+            sender, receiver = pair
+            batch = WriteBatch()
+            connection = SocketConnection(sender, ServerMetrics(), batch, SendLimits())
+            connection.protocol = protocol
+            try:
+                for _ in range(rounds):
+                    if batched:
+                        with batch:
+                            for message in turn:
+                                connection.send(message)
+                    else:
+                        for message in turn:
+                            connection.send(message)
+                    receiver.recv(1 << 20)
+            finally:
+                sender.close()
+                receiver.close()
+            return rounds * len(turn)
+        return setup, run
+    return bench
+
+
+BENCHMARKS = [
+    ('board.add_ship', bench_add_ship),
+    ('board.is_valid_placement', bench_is_valid_placement),
+    ('board.receive_shot', bench_receive_shot),
+    ('fleet.random', bench_place_fleet),
+    ('fleet.uniform', bench_place_fleet_uniform),
+    ('fleet.validate', bench_validate_fleet),
+    ('bot.random', bench_bot('random')),
+    ('bot.probability', bench_bot('probability')),
+    ('codec.encode.json', bench_encode(PROTOCOL_JSON)),
+    ('codec.encode.bin1', bench_encode(PROTOCOL_BINARY)),
+    ('codec.decode.json', bench_decode(PROTOCOL_JSON)),
+    ('codec.decode.bin1', bench_decode(PROTOCOL_BINARY)),
+    ('send.json', bench_connection_send(PROTOCOL_JSON, batched=False)),
+    ('send.bin1', bench_connection_send(PROTOCOL_BINARY, batched=False)),
+    ('send.batched.json', bench_connection_send(PROTOCOL_JSON, batched=True)),
+    ('send.batched.bin1', bench_connection_send(PROTOCOL_BINARY, batched=True)),
+]
+
+# Uniform fleets are rejection-sampled; on big boards an accepted draw is too rare to time
+SMALL_BOARD_ONLY = {'fleet.uniform'}
+
+
+# --- Runner ---
+def measure(setup, run, repeat):
+    """Best time per operation, in nanoseconds, over `repeat` fresh runs."""
+    best = None
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        ops = run(state)
+        per_op = (time.perf_counter() - start) / ops
+        best = per_op if best is None else min(best, per_op)
+    return best * 1e9, ops
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(grid_sizes, repeat, seed, selected=None):
+    results = []
+    for grid_size in grid_sizes:
+        ship_sizes = scaled_fleet(grid_size)
+        for name, bench in BENCHMARKS:
+            if selected and not any(name.startswith(prefix) for prefix in selected):
+                continue
+            if name in SMALL_BOARD_ONLY and grid_size > GRID_SIZE:
+                continue
+            setup, run = bench(grid_size, ship_sizes, random.Random(seed))
+            ns_per_op, ops = measure(setup, run, repeat)
+            results.append({'name': name, 'grid_size': grid_size, 'ships': len(ship_sizes),
+                            'ns_per_op': round(ns_per_op, 1), 'ops': ops})
+            print(f"{name:28} {grid_size:3}x{grid_size:<3} {ns_per_op:14,.1f} ns/op")
+    return results
+
+
+def compare(results, baseline_path):
+    """Prints each result's time as a ratio of the same benchmark in a saved run."""
+    with open(baseline_path) as f:
+        baseline = {(r['name'], r['grid_size']): r['ns_per_op'] for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path} (ratio < 1 is faster):")
+    for result in results:
+        old = baseline.get((result['name'], result['grid_size']))
+        if old:
+            print(f"{result['name']:28} {result['grid_size']:3}x{result['grid_size']:<3} "
+                  f"{old:14,.1f} -> {result['ns_per_op']:14,.1f} ns/op  x{result['ns_per_op'] / old:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the board, bot and codec hot paths.")
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=[10, 20, 40],
+                        help="Board sizes; the fleet is scaled to cover the same share of each.")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per benchmark; the best is kept.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-k', '--only', nargs='+', help="Run only benchmarks whose names start with these.")
+    parser.add_argument('-o', '--output', default='bench_results.json', help="Where to write the JSON results.")
+    parser.add_argument('--compare', help="A previous JSON results file to compare against.")
+    args = parser.parse_args()
+
+    results = run_suite(args.grid_sizes, args.repeat, args.seed, args.only)
+    report = {
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
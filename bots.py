@@ -0,0 +1,442 @@
+import random
+from collections import Counter
+
+from common import GRID_SIZE, SHIP_SIZES, legal_placements, placement_lookup, placements_for
+
+
+# --- Fleet Placement ---
+SEQUENTIAL_STEP_LIMIT = 2000  # Placements the ship-by-ship draw may try before switching to the packing search
+PACKING_FIRST_BUDGET = 1000  # Choices the first packing search may try; each restart gets twice as many
+PLACEMENT_STEP_LIMIT = 50000  # Choices all packing searches for one fleet may try before giving up
+UNIFORM_ATTEMPT_LIMIT = 20000  # Draws uniform=True may reject for one fleet before giving up
+
+
+class StepLimitReached(Exception):
+    """A fleet search used up its step budget."""
+
+
+def random_fleet(ship_sizes=SHIP_SIZES, grid_size=GRID_SIZE, rng=random, occupied=0, uniform=False):
+    """Returns one Placement per ship, in ship_sizes order, for a random fleet that fits together.
+
+    By default ships are placed largest first, each drawn uniformly from the
+    placements still legal after the ones before it, backing out of a draw
+    that leaves the rest no room. That is the layout distribution the PvE
+    bot has always used. A fleet too dense for that to finish quickly is
+    packed cell by cell instead (see _pack_fleet), which is less evenly
+    spread but finds layouts that random draws almost never do.
+
+    uniform=True is rejection sampling, not the rejection-free uniform
+    sampler the name might suggest: a sequential draw is kept with
+    probability prod(legal options) / prod(all placements) and otherwise
+    redrawn, so a layout it returns is exactly uniform, but a call may take
+    up to UNIFORM_ATTEMPT_LIMIT draws and then gives up. Only sparse fleets
+    like SHIP_SIZES on 10x10 are accepted reliably. Sampling exactly
+    without rejection would mean counting the completions of every partial
+    layout, which is out of reach here.
+
+    Raises ValueError if the fleet cannot fit, or if the packing searches
+    take PLACEMENT_STEP_LIMIT steps or uniform sampling UNIFORM_ATTEMPT_LIMIT
+    draws without a layout, so every call finishes.
+    """
+    order = sorted(range(len(ship_sizes)), key=lambda i: -ship_sizes[i])
+    sizes = [ship_sizes[i] for i in order]
+    free = grid_size * grid_size - bin(occupied).count('1')
+    if sum(sizes) > free:
+        raise ValueError(f"A fleet of {list(ship_sizes)} does not fit on a {grid_size}x{grid_size} board")
+
+    placed = None
+    if uniform:
+        for _ in range(UNIFORM_ATTEMPT_LIMIT):
+            placed = _uniform_attempt(sizes, grid_size, rng, occupied)
+            if placed is not None:
+                break
+    if placed is None:
+        placed = []
+        try:
+            fits = _place_rest(sizes, 0, occupied, grid_size, rng, placed, [SEQUENTIAL_STEP_LIMIT])
+        except StepLimitReached:
+            placed = _pack_with_restarts(sizes, occupied, free, grid_size, rng)
+            fits = placed is not None
+        if not fits:
+            raise ValueError(f"A fleet of {list(ship_sizes)} does not fit on a {grid_size}x{grid_size} board")
+        if uniform:  # It fits, so the draws were just never accepted
+            raise ValueError(f"No uniform layout of {list(ship_sizes)} on a {grid_size}x{grid_size} board accepted "
+                             f"in {UNIFORM_ATTEMPT_LIMIT} draws; the fleet is too dense for uniform=True")
+
+    by_size = {}
+    for placement in placed:
+        by_size.setdefault(len(placement.cells), []).append(placement)
+    return [by_size[size].pop() for size in ship_sizes]
+
+
+def _place_rest(sizes, index, occupied, grid_size, rng, fleet, steps):
+    """Depth-first placement of sizes[index:] (largest first); backtracks out of dead ends."""
+    if index == len(sizes):
+        return True
+    options = legal_placements(sizes[index], occupied, grid_size)
+    if len(options) < sizes[index:].count(sizes[index]):
+        return False  # Fewer spots left than ships of this size still to place
+    while options:
+        steps[0] -= 1
+        if steps[0] < 0:
+            raise StepLimitReached()
+        # Uniform pick without replacement (swap-remove), so no option is drawn twice
+        i = rng.randrange(len(options))
+        placement = options[i]
+        options[i] = options[-1]
+        options.pop()
+
+        fleet.append(placement)
+        if _place_rest(sizes, index + 1, occupied | placement.mask, grid_size, rng, fleet, steps):
+            return True
+        fleet.pop()
+    return False
+
+
+def _pack_with_restarts(sizes, occupied, free, grid_size, rng):
+    """Runs _pack_fleet with doubling budgets, as one unlucky early choice can stall a search for good."""
+    budget, spent = PACKING_FIRST_BUDGET, 0
+    while spent < PLACEMENT_STEP_LIMIT:
+        try:
+            return _pack_fleet(sizes, occupied, free, grid_size, rng, min(budget, PLACEMENT_STEP_LIMIT - spent))
+        except StepLimitReached:
+            spent += budget
+            budget *= 2
+    raise ValueError(f"Gave up packing a fleet of {sorted(sizes, reverse=True)} on a "
+                     f"{grid_size}x{grid_size} board after {PLACEMENT_STEP_LIMIT} tries")
+
+
+def _pack_fleet(sizes, occupied, free, grid_size, rng, steps):
+    """Packs a dense fleet by deciding each open cell in turn; returns its Placements, or None if it cannot fit.
+
+    Raises StepLimitReached after `steps` choices without an answer.
+
+    Every cell before the current one is already covered or left empty, so
+    a ship covering the current cell must start there: the choices are one
+    of the remaining ships starting there, H or V, or leaving the cell empty
+    while the fleet has cells to spare. That bounds each step to a few
+    choices, and a choice that cuts off more open cells from every remaining
+    ship than the fleet can leave empty is undone at once, which is what
+    lets near-complete packings finish. Choices are tried in random
+    order; the search is an explicit stack, as big boards go deeper than
+    Python's recursion limit.
+    """
+    n_cells = grid_size * grid_size
+    remaining = Counter(sizes)
+    left = len(sizes)
+    spare = free - sum(sizes)  # Open cells that may still be left empty
+    blocked = occupied
+    placed = []
+    stack = []  # [cell, untried choices, choice in effect or None for an empty cell, whether one is in effect]
+    cell, descend = 0, True
+    while True:
+        if descend:
+            if not left:
+                return placed
+            while cell < n_cells and blocked >> cell & 1:
+                cell += 1
+            choices = [None] if spare else []
+            col, row = cell % grid_size, cell // grid_size
+            for size, count in remaining.items():
+                for orientation in ('H', 'V') if count and size > 1 else ('H',) if count else ():
+                    placement = placement_lookup(size, grid_size).get((col, row, orientation))
+                    if placement is not None and not placement.mask & blocked:
+                        choices.append(placement)
+            rng.shuffle(choices)
+            stack.append([cell, choices, None, False])
+
+        frame = stack[-1]
+        if frame[3]:  # Undo the choice this frame made before trying the next
+            choice = frame[2]
+            if choice is None:
+                blocked &= ~(1 << frame[0])
+                spare += 1
+            else:
+                blocked &= ~choice.mask
+                remaining[len(choice.cells)] += 1
+                left += 1
+                placed.pop()
+            frame[3] = False
+        if not frame[1]:
+            stack.pop()
+            if not stack:
+                return None
+            descend = False
+            continue
+
+        steps -= 1
+        if steps < 0:
+            raise StepLimitReached()
+        choice = frame[1].pop()
+        if choice is None:
+            blocked |= 1 << frame[0]
+            spare -= 1
+        else:
+            blocked |= choice.mask
+            remaining[len(choice.cells)] -= 1
+            left -= 1
+            placed.append(choice)
+        frame[2], frame[3] = choice, True
+        cell = frame[0]
+        # Open cells this choice cuts off from every remaining ship must stay empty
+        descend = _cut_off(choice.cells if choice is not None else (cell,), blocked, remaining, grid_size) <= spare
+
+
+_covering = {}  # (grid_size, size) -> cell -> masks of the placements covering it
+
+
+def _placements_covering(size, grid_size):
+    key = (grid_size, size)
+    if key not in _covering:
+        by_cell = [[] for _ in range(grid_size * grid_size)]
+        for placement in placements_for(size, grid_size):
+            for cell in placement.cells:
+                by_cell[cell].append(placement.mask)
+        _covering[key] = by_cell
+    return _covering[key]
+
+
+def _neighbours(cell, grid_size):
+    col, row = cell % grid_size, cell // grid_size
+    if col > 0:
+        yield cell - 1
+    if col < grid_size - 1:
+        yield cell + 1
+    if row > 0:
+        yield cell - grid_size
+    if row < grid_size - 1:
+        yield cell + grid_size
+
+
+def _cut_off(cells, blocked, remaining, grid_size):
+    """A lower bound on the open cells around `cells` that no remaining ship can use.
+
+    Counts open neighbours no remaining ship fits over, and for each small
+    enclosed region of open cells next to `cells`, whatever its size leaves
+    over once filled as fully as the remaining ship sizes allow (an odd
+    pocket among 2-cell ships wastes one).
+    """
+    limit = 4 * grid_size  # Regions bigger than this are not measured
+    counted = set()
+    large = set()  # Cells of regions already found to be over the limit
+    waste = 0
+    for covered in cells:
+        for start in _neighbours(covered, grid_size):
+            if blocked >> start & 1 or start in counted:
+                continue
+            region = None if start in large else _region(start, blocked, grid_size, limit)
+            if region is not None and len(region) <= limit:
+                counted |= region
+                waste += len(region) - _best_fill(len(region), remaining)
+                continue
+            if region is not None:
+                large |= region
+            if not any(not mask & blocked for size, count in remaining.items() if count
+                       for mask in _placements_covering(size, grid_size)[start]):
+                counted.add(start)
+                waste += 1
+    return waste
+
+
+def _region(start, blocked, grid_size, limit):
+    """The open cells connected to `start`, stopping once there are more than `limit`."""
+    region, frontier = {start}, [start]
+    for cell in frontier:
+        for neighbour in _neighbours(cell, grid_size):
+            if not blocked >> neighbour & 1 and neighbour not in region:
+                region.add(neighbour)
+                frontier.append(neighbour)
+        if len(region) > limit:
+            break
+    return region
+
+
+def _best_fill(cells, remaining):
+    """The most of `cells` cells that some of the remaining ships add up to."""
+    sums = 1  # Bit n set: n cells can be filled exactly
+    full = (1 << (cells + 1)) - 1
+    for size, count in remaining.items():
+        for _ in range(count):
+            sums = (sums | sums << size) & full
+            if sums >> cells & 1:
+                return cells
+    return sums.bit_length() - 1
+
+
+def _uniform_attempt(ship_sizes, grid_size, rng, occupied):
+    """One sequential draw, kept with the probability that makes every layout equally likely."""
+    fleet, weight = [], 1.0
+    for size in ship_sizes:
+        options = legal_placements(size, occupied, grid_size)
+        if not options:
+            return None
+        placement = options[rng.randrange(len(options))]
+        weight *= len(options) / len(placements_for(size, grid_size))
+        fleet.append(placement)
+        occupied |= placement.mask
+    return fleet if rng.random() < weight else None
+
+
+def generate_fleets(count, ship_sizes=SHIP_SIZES, grid_size=GRID_SIZE, seed=None, uniform=False):
+    """Yields `count` random fleets from one seeded RNG; batchsim places the boards it cannot fill with it."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield random_fleet(ship_sizes, grid_size, rng, uniform=uniform)
+
+
+def place_fleet(board, ship_sizes=SHIP_SIZES, rng=random, uniform=False):
+    """Places a random fleet on a board around any ships already there."""
+    for size, placement in zip(ship_sizes, random_fleet(ship_sizes, board.grid_size, rng, board.occupied, uniform)):
+        board.add_ship(size, placement.col, placement.row, placement.orientation)
+
+
+# --- Shot Strategies ---
+# A strategy picks shots for one player. choose_shot() is given that
+# player's own PlayerBoard, whose shots_fired and unfired pool record every
+# earlier shot, and record_result() is told what each shot did.
+class RandomBot:
+    """Fires at a random cell it has not tried yet."""
+
+    def __init__(self, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES, rng=random):
+        self.grid_size = grid_size
+        self.rng = rng
+
+    def choose_shot(self, board):
+        return board.random_unfired_cell(self.rng)
+
+    def record_result(self, col, row, result):
+        pass
+
+
+class ProbabilityBot:
+    """Hunts with a placement-count heatmap and finishes ships off around hits.
+
+    heat[cell] counts how many placements of the ships still afloat could
+    cover that cell without touching a miss or a sunk ship. It is built once
+    from the shared placement index and then only adjusted for the placements a
+    shot rules out, so picking a move never rescans the board. While there
+    are unexplained hits the bot is in target mode and only scores cells on
+    placements that run through those hits.
+    """
+
+    def __init__(self, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES, rng=random):
+        self.grid_size = grid_size
+        self.rng = rng
+        n_cells = grid_size * grid_size
+
+        self.remaining = Counter(ship_sizes)  # size -> ships of that size still afloat
+        self.placements = {size: [placement.cells for placement in placements_for(size, grid_size)]
+                           for size in self.remaining}
+        self.by_cell = {}  # size -> cell -> ids of placements covering it
+        self.alive = {}  # size -> 1 for each placement not yet ruled out
+        self.heat = [0] * n_cells
+        for size, spans in self.placements.items():
+            by_cell = [[] for _ in range(n_cells)]
+            for pid, cells in enumerate(spans):
+                for cell in cells:
+                    by_cell[cell].append(pid)
+                    self.heat[cell] += self.remaining[size]
+            self.by_cell[size] = by_cell
+            self.alive[size] = bytearray(b'\x01') * len(spans)
+
+        self.fired = bytearray(n_cells)
+        self.open_hits = set()  # Hit cells not yet credited to a sunk ship
+
+    def choose_shot(self, board):
+        cell = self._target_cell() if self.open_hits else None
+        if cell is None:
+            cell = self._hunt_cell(board)
+        return cell % self.grid_size, cell // self.grid_size
+
+    def record_result(self, col, row, result):
+        cell = row * self.grid_size + col
+        self.fired[cell] = 1
+        if result == 'Miss':
+            self._block(cell)
+            return
+
+        self.open_hits.add(cell)
+        if result == 'Sunk':
+            size, cells = self._sunk_ship(cell)
+            self.open_hits.difference_update(cells)
+            # One fewer ship of this size: drop one copy of each placement it still had
+            self.remaining[size] -= 1
+            alive = self.alive[size]
+            for pid, cells_ in enumerate(self.placements[size]):
+                if alive[pid]:
+                    for c in cells_:
+                        self.heat[c] -= 1
+            for c in cells:
+                self._block(c)
+
+    def _block(self, cell):
+        """Rules out every placement covering a cell that can no longer hold a ship."""
+        for size, count in self.remaining.items():
+            alive = self.alive[size]
+            for pid in self.by_cell[size][cell]:
+                if alive[pid]:
+                    alive[pid] = 0
+                    if count:
+                        for c in self.placements[size][pid]:
+                            self.heat[c] -= count
+
+    def _hunt_cell(self, board):
+        best, choices = -1, []
+        heat = self.heat
+        for cell in board.unfired:
+            if heat[cell] < best:
+                continue
+            if heat[cell] > best:
+                best, choices = heat[cell], []
+            choices.append(cell)
+        return self.rng.choice(choices)
+
+    def _target_cell(self):
+        """Scores unfired cells on live placements through open hits, favouring lines of hits."""
+        scores = Counter()
+        for hit in self.open_hits:
+            for size, count in self.remaining.items():
+                if not count:
+                    continue
+                alive, spans = self.alive[size], self.placements[size]
+                for pid in self.by_cell[size][hit]:
+                    if alive[pid]:
+                        cells = spans[pid]
+                        covered = sum(1 for c in cells if c in self.open_hits)
+                        for c in cells:
+                            if not self.fired[c]:
+                                scores[c] += count * covered
+        if not scores:
+            return None
+        best = max(scores.values())
+        return self.rng.choice([cell for cell, score in scores.items() if score == best])
+
+    def _sunk_ship(self, cell):
+        """Guesses which ship just sank: the largest one afloat that fits the line of hits at `cell`."""
+        n = self.grid_size
+        col, row = cell % n, cell // n
+        runs = []
+        for step, limit_back, limit_fwd in ((1, col, n - 1 - col), (n, row, n - 1 - row)):
+            back = 0
+            while back < limit_back and cell - (back + 1) * step in self.open_hits:
+                back += 1
+            fwd = 0
+            while fwd < limit_fwd and cell + (fwd + 1) * step in self.open_hits:
+                fwd += 1
+            runs.append((step, back, fwd))
+
+        for size in sorted((s for s, count in self.remaining.items() if count), reverse=True):
+            for step, back, fwd in runs:
+                if back + fwd + 1 >= size:
+                    # Prefer the hits behind the sinking shot, the usual way a line is extended
+                    start = cell - min(back, size - 1) * step
+                    return size, [start + i * step for i in range(size)]
+
+        size = min(s for s, count in self.remaining.items() if count)
+        return size, [cell]
+
+
+STRATEGIES = {
+    'random': RandomBot,
+    'probability': ProbabilityBot,
+}
@@ -3,17 +3,22 @@ from tkinter import messagebox, simpledialog
 import math
 import socket
 import threading
-import json
 import sys
-import random
 import time
 
+from bots import STRATEGIES, place_fleet
+
 # Import all our common classes and functions
 from common import (
-    PlayerBoard, GRID_SIZE, SQUARE_SIZE, CANVAS_SIZE, SHIP_SIZES, SHIP_COLORS,
-    draw_grid_lines, draw_hit_marker, draw_miss_marker
+    PlayerBoard, GRID_SIZE, SQUARE_SIZE, CANVAS_SIZE, SHIP_SIZES, BoardRenderer,
+    FrameDecoder, PROTOCOL_JSON, PROTOCOL_BINARY, UNSEQUENCED_MESSAGES, encode_message, decode_message, pack_fleet
 )
 
+SERVER_PORT = 65432
+RECONNECT_ATTEMPTS = 30
+RECONNECT_DELAY = 2  # Seconds between attempts to reach a restarted server
+RECONNECT_TIMEOUT = 5  # Seconds one attempt may wait for the server to answer
+
 
 # ---
 # ---
@@ -22,7 +27,7 @@ from common import (
 # ---
 
 class BattleshipGame_PvE(tk.Tk):
-    def __init__(self):
+    def __init__(self, bot_strategy='random'):
         super().__init__()
         self.title("Battleship - Player vs. Bot")
         self.geometry(f"{CANVAS_SIZE * 2 + 150}x{CANVAS_SIZE + 200}")
@@ -30,6 +35,7 @@ class BattleshipGame_PvE(tk.Tk):
         # Game State
         self.player_board = PlayerBoard("Player 1")
         self.bot_board = PlayerBoard("Bot")
+        self.bot = STRATEGIES[bot_strategy]()
 
         self.current_ship_orientation = 'H'
         self.game_phase = 'Placement'  # Placement, Attack
@@ -62,10 +68,14 @@ class BattleshipGame_PvE(tk.Tk):
                                          highlightthickness=1)
         self.opponent_canvas.pack(side=tk.RIGHT, padx=10)
 
-    def draw_grid(self, canvas, draw_ships=True, board=None):
-        canvas.delete("all")
-        draw_grid_lines(canvas)
+        # Canvas items persist; renderers only add or change what differs
+        self.ship_view = BoardRenderer(self.ship_canvas)
+        self.opponent_view = BoardRenderer(self.opponent_canvas)
 
+    def view_for(self, canvas):
+        return self.ship_view if canvas is self.ship_canvas else self.opponent_view
+
+    def draw_grid(self, canvas, draw_ships=True, board=None):
         if board is None:
             board = self.player_board
 
@@ -75,33 +85,13 @@ class BattleshipGame_PvE(tk.Tk):
             self.draw_shots_on_canvas(canvas, board)
 
     def draw_ships_on_canvas(self, canvas, player):
-        for ship in player.ships:
-            c, r = ship['col'], ship['row']
-            size, orientation = ship['size'], ship['orientation']
-
-            x1, y1 = c * SQUARE_SIZE, r * SQUARE_SIZE
-            width = SQUARE_SIZE * size if orientation == 'H' else SQUARE_SIZE
-            height = SQUARE_SIZE if orientation == 'H' else SQUARE_SIZE * size
-            x2, y2 = x1 + width, y1 + height
-
-            color = SHIP_COLORS.get(size, "gray")
-            canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-
-            if self.game_phase == 'Attack':
-                for i in range(size):
-                    hit_col = c + i if orientation == 'H' else c
-                    hit_row = r + i if orientation == 'V' else r
-                    if player.grid[hit_row][hit_col] == 'H':
-                        draw_hit_marker(canvas, hit_col, hit_row)
+        view = self.view_for(canvas)
+        view.sync_ships(player)
+        if self.game_phase == 'Attack':
+            view.sync_marks(player.grid, kinds=('H',))
 
     def draw_shots_on_canvas(self, canvas, player):
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                shot = player.shots_fired[r][c]
-                if shot == 'H':
-                    draw_hit_marker(canvas, c, r)
-                elif shot == 'M':
-                    draw_miss_marker(canvas, c, r)
+        self.view_for(canvas).sync_marks(player.shots_fired)
 
     def rotate_ship(self):
         if self.game_phase == 'Placement' and self.player_board.current_ship_index < len(SHIP_SIZES):
@@ -114,8 +104,6 @@ class BattleshipGame_PvE(tk.Tk):
         self.status_label.config(fg='black')
         self.ship_canvas.config(bg='lightblue')
         self.opponent_canvas.config(bg='lightgray')
-        self.opponent_canvas.delete("all")
-        draw_grid_lines(self.opponent_canvas)
         self.draw_grid(self.ship_canvas, draw_ships=True, board=self.player_board)
         self.update_status()
 
@@ -133,37 +121,22 @@ class BattleshipGame_PvE(tk.Tk):
         self.rotate_button.config(state=tk.DISABLED)
 
     def bot_place_ships(self):
-        for size in SHIP_SIZES:
-            placed = False
-            while not placed:
-                col = random.randint(0, GRID_SIZE - 1)
-                row = random.randint(0, GRID_SIZE - 1)
-                orientation = random.choice(['H', 'V'])
-
-                if self.bot_board.is_valid_placement(size, col, row, orientation):
-                    self.bot_board.add_ship(size, col, row, orientation)
-                    placed = True
-
+        place_fleet(self.bot_board)
         self.start_attack_phase()
 
     def bot_take_turn(self):
-        chosen = False
-        while not chosen:
-            col = random.randint(0, GRID_SIZE - 1)
-            row = random.randint(0, GRID_SIZE - 1)
-
-            if self.bot_board.shots_fired[row][col] == 0:
-                chosen = True
+        col, row = self.bot.choose_shot(self.bot_board)
 
         result, is_sunk = self.player_board.receive_shot(col, row)
-        shot_mark = 'H' if result in ('Hit', 'Sunk') else 'M'
-        self.bot_board.shots_fired[row][col] = shot_mark
+        self.bot_board.record_shot(col, row, result)
+        self.bot.record_result(col, row, result)
 
-        self.draw_grid(self.ship_canvas, draw_ships=True, board=self.player_board)
+        if result != 'Miss':
+            self.ship_view.mark_cell(col, row, 'H')
 
         coord_str = f"{chr(ord('A') + col)}{row + 1}"
 
-        if self.player_board.ships_sunk_count == len(SHIP_SIZES):
+        if self.player_board.all_ships_sunk():
             self.status_var.set(f"Bot {result} at {coord_str}!")
             messagebox.showinfo("Game Over!", "The Bot Wins!")
             self.destroy()
@@ -188,23 +161,11 @@ class BattleshipGame_PvE(tk.Tk):
 
         c, r = self.get_grid_coords(event.x, event.y)
         if self.player_board.current_ship_index >= len(SHIP_SIZES):
-            self.ship_canvas.delete("ghost")
+            self.ship_view.hide_ghost()
             return
 
         current_size = SHIP_SIZES[self.player_board.current_ship_index]
-        is_valid = self.player_board.is_valid_placement(current_size, c, r, self.current_ship_orientation)
-
-        self.ship_canvas.delete("ghost")
-        # Redraw ships *first* to clear old ghost
-        self.draw_grid(self.ship_canvas, draw_ships=True, board=self.player_board)
-
-        x1, y1 = c * SQUARE_SIZE, r * SQUARE_SIZE
-        width = SQUARE_SIZE * current_size if self.current_ship_orientation == 'H' else SQUARE_SIZE
-        height = SQUARE_SIZE if self.current_ship_orientation == 'H' else SQUARE_SIZE * current_size
-        x2, y2 = x1 + width, y1 + height
-
-        color = 'green' if is_valid else 'red'
-        self.ship_canvas.create_rectangle(x1, y1, x2, y2, outline=color, width=3, tags="ghost")
+        self.ship_view.show_ghost(self.player_board, current_size, c, r, self.current_ship_orientation)
 
     def canvas_click(self, event):
         c, r = self.get_grid_coords(event.x, event.y)
@@ -225,7 +186,7 @@ class BattleshipGame_PvE(tk.Tk):
 
         if self.player_board.is_valid_placement(current_size, c, r, self.current_ship_orientation):
             self.player_board.add_ship(current_size, c, r, self.current_ship_orientation)
-            self.ship_canvas.delete("ghost")
+            self.ship_view.hide_ghost()
             self.draw_grid(self.ship_canvas, draw_ships=True, board=self.player_board)
             self.update_status()
 
@@ -245,12 +206,11 @@ class BattleshipGame_PvE(tk.Tk):
             return
 
         result, is_sunk = self.bot_board.receive_shot(c, r)
-        shot_mark = 'H' if result in ('Hit', 'Sunk') else 'M'
-        self.player_board.shots_fired[r][c] = shot_mark
+        self.player_board.record_shot(c, r, result)
 
-        self.draw_grid(self.opponent_canvas, draw_ships=False, board=self.player_board)
+        self.opponent_view.mark_cell(c, r, self.player_board.shots_fired[r][c])
 
-        if self.bot_board.ships_sunk_count == len(SHIP_SIZES):
+        if self.bot_board.all_ships_sunk():
             self.status_var.set(f"You {result} at {chr(ord('A') + c)}{r + 1}!")
             messagebox.showinfo("Game Over!", "You Win!")
             self.destroy()
@@ -309,6 +269,10 @@ class BattleshipGame_Client(tk.Tk):
         self.sock = None
         self.network_thread = None
         self.player_name = "Player"
+        self.wire_protocol = PROTOCOL_JSON
+        self.session_token = None  # From GREETING; lets a new connection resume this game
+        self.received = 0  # Sequenced messages from our seat so far, for RESUME
+        self.reattaching = False
 
         # Game State
         self.my_board = PlayerBoard("MyBoard")
@@ -343,49 +307,20 @@ class BattleshipGame_Client(tk.Tk):
                                          highlightthickness=1)
         self.opponent_canvas.pack(side=tk.RIGHT, padx=10)
 
+        # Canvas items persist; renderers only add or change what differs
+        self.my_view = BoardRenderer(self.ship_canvas)
+        self.opponent_view = BoardRenderer(self.opponent_canvas)
+
     # --- Drawing Functions ---
 
     def draw_my_board(self):
         """Draws the player's own board (left canvas)."""
-        canvas = self.ship_canvas
-        canvas.delete("all")
-        draw_grid_lines(canvas)
-
-        # Draw ships
-        for ship in self.my_board.ships:
-            c, r = ship['col'], ship['row']
-            size, orientation = ship['size'], ship['orientation']
-
-            x1, y1 = c * SQUARE_SIZE, r * SQUARE_SIZE
-            width = SQUARE_SIZE * size if orientation == 'H' else SQUARE_SIZE
-            height = SQUARE_SIZE if orientation == 'H' else SQUARE_SIZE * size
-            x2, y2 = x1 + width, y1 + height
-
-            color = SHIP_COLORS.get(size, "gray")
-            canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-
-        # Draw hits/misses on my board
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                if self.my_board.grid[r][c] == 'H':
-                    draw_hit_marker(canvas, c, r)
-                elif self.my_board.grid[r][c] == 'M':
-                    draw_miss_marker(canvas, c, r)
+        self.my_view.sync_ships(self.my_board)
+        self.my_view.sync_marks(self.my_board.grid)
 
     def draw_opponent_board(self):
         """Draws the opponent's board (right canvas) showing player's shots."""
-        canvas = self.opponent_canvas
-        canvas.delete("all")
-        draw_grid_lines(canvas)
-
-        # Draw shots fired
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                shot = self.my_board.shots_fired[r][c]
-                if shot == 'H':
-                    draw_hit_marker(canvas, c, r)
-                elif shot == 'M':
-                    draw_miss_marker(canvas, c, r)
+        self.opponent_view.sync_marks(self.my_board.shots_fired)
 
     def rotate_ship(self):
         if self.game_phase == 'Placement' and self.my_board.current_ship_index < len(SHIP_SIZES):
@@ -398,51 +333,83 @@ class BattleshipGame_Client(tk.Tk):
 
     def connect_to_server(self):
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect((self.host_ip, 65432))
-
-            self.network_thread = threading.Thread(target=self.listen_to_server)
-            self.network_thread.daemon = True
-            self.network_thread.start()
+            self.open_connection(self.connect_socket())
             self.status_var.set("Connected! Waiting for opponent...")
         except Exception as e:
             messagebox.showerror("Connection Error", f"Failed to connect to {self.host_ip}: {e}")
             self.destroy()
 
-    def listen_to_server(self):
+    def connect_socket(self, timeout=None):
+        sock = socket.create_connection((self.host_ip, SERVER_PORT), timeout)
+        sock.settimeout(None)  # listen_to_server blocks in recv
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # A SHOT must not wait for an ACK
+        return sock
+
+    def open_connection(self, sock):
+        self.sock = sock
+        self.wire_protocol = PROTOCOL_JSON  # Every connection starts out on JSON
+
+        self.network_thread = threading.Thread(target=self.listen_to_server, args=(self.sock,))
+        self.network_thread.daemon = True
+        self.network_thread.start()
+
+    def listen_to_server(self, sock):
         """Runs in a separate thread to receive messages from the server."""
+        decoder = FrameDecoder()
         while True:
             try:
-                # Read header
-                header = self.sock.recv(8)
-                if not header:
+                if not decoder.recv_into(sock):
                     break
-                msg_len = int(header.decode('utf-8').strip())
 
-                # Read full message
-                data = b''
-                while len(data) < msg_len:
-                    packet = self.sock.recv(msg_len - len(data))
-                    if not packet:
-                        break
-                    data += packet
+                for payload in decoder.frames():
+                    message = decode_message(payload)
 
-                message = json.loads(data.decode('utf-8'))
-
-                # Safely update GUI from the main thread
-                self.after(0, self.handle_server_message, message)
+                    # Safely update GUI from the main thread
+                    self.after(0, self.handle_server_message, message)
 
             except Exception as e:
                 print(f"Error in listen_to_server: {e}")
-                self.after(0, lambda: self.status_var.set("Connection to server lost."))
                 break
+        self.after(0, self.connection_lost, sock)
+
+    def connection_lost(self, sock):
+        if sock is not self.sock:
+            return  # An old connection we already replaced
+        if self.session_token and self.game_phase in ('Placement', 'Attack', 'Waiting'):
+            self.status_var.set("Connection to server lost. Reconnecting...")
+            threading.Thread(target=self.reconnect, args=(self.session_token,), daemon=True).start()
+        else:
+            self.status_var.set("Connection to server lost.")
+
+    def reconnect(self, token):
+        """Runs in a separate thread, so a dead network never freezes the GUI, until the server answers again."""
+        for attempt in range(RECONNECT_ATTEMPTS):
+            if attempt:
+                time.sleep(RECONNECT_DELAY)
+            if self.session_token != token:
+                return  # The window was closed
+            try:
+                sock = self.connect_socket(RECONNECT_TIMEOUT)
+            except OSError:
+                continue
+            self.after(0, self.resume_session, sock, token)
+            return
+        self.after(0, self.status_var.set, "Could not reconnect to the server.")
+
+    def resume_session(self, sock, token):
+        """Switches to a reconnected socket and asks the server for this game's seat back, and what we missed."""
+        if self.session_token != token:
+            sock.close()
+            return
+        self.open_connection(sock)
+        # The server may pair the new connection before it reads this; see "reattaching" below
+        self.reattaching = True
+        self.send_to_server({"type": "RESUME", "token": self.session_token, "seq": self.received})
 
     def send_to_server(self, message):
         """Sends a message to the server."""
         try:
-            data = json.dumps(message).encode('utf-8')
-            header = f"{len(data):<8}".encode('utf-8')
-            self.sock.sendall(header + data)
+            self.sock.sendall(encode_message(message, self.wire_protocol))
         except Exception as e:
             self.status_var.set(f"Error sending message: {e}")
 
@@ -450,9 +417,39 @@ class BattleshipGame_Client(tk.Tk):
         """Processes messages from the server on the main GUI thread."""
         msg_type = message.get("type")
 
+        if self.reattaching and msg_type not in ("STATE", "RESUMED", "RESUME_FAILED"):
+            return  # Lobby or fresh-room messages for the new connection; the server drops that room
+        if msg_type not in UNSEQUENCED_MESSAGES:
+            self.received += 1
+
         if msg_type == "GREETING":
             self.player_name = message['name']
+            self.session_token = message.get('token')
             self.title(f"Battleship - {self.player_name}")
+            if PROTOCOL_BINARY in message.get('protocols', []):
+                # The server decodes binary frames as soon as it sees them
+                self.send_to_server({"type": "HELLO", "protocol": PROTOCOL_BINARY})
+                self.wire_protocol = PROTOCOL_BINARY
+
+        elif msg_type == "STATE":
+            self.apply_state(message)
+
+        elif msg_type == "RESUMED":
+            self.apply_resume(message)
+
+        elif msg_type == "RESUME_FAILED":
+            # The server would seat this connection in a new game; the window only shows the old one
+            self.reattaching = False
+            self.session_token = None
+            sock, self.sock = self.sock, None  # So connection_lost leaves the message below in place
+            sock.close()
+            self.status_var.set("The game could not be resumed.")
+
+        elif msg_type == "OPPONENT_AWAY":
+            self.status_var.set("Opponent lost their connection. Waiting for them to come back...")
+
+        elif msg_type == "OPPONENT_BACK":
+            self.update_status()
 
         elif msg_type == "START_PLACEMENT":
             self.game_phase = "Placement"
@@ -493,10 +490,9 @@ class BattleshipGame_Client(tk.Tk):
             # This is the result of *my* shot
             c, r = message['col'], message['row']
             result = message['result']
-            shot_mark = 'H' if result in ('Hit', 'Sunk') else 'M'
 
-            self.my_board.shots_fired[r][c] = shot_mark
-            self.draw_opponent_board()  # Redraw to show the new shot
+            self.my_board.record_shot(c, r, result)
+            self.opponent_view.mark_cell(c, r, self.my_board.shots_fired[r][c])  # Show the new shot
 
             if result == 'Sunk':
                 self.status_var.set(f"You SANK their ship! Attack again.")
@@ -517,7 +513,7 @@ class BattleshipGame_Client(tk.Tk):
 
             # The server already updated its board, we just need to mirror it
             self.my_board.grid[r][c] = 'H' if result in ('Hit', 'Sunk') else 'M'
-            self.draw_my_board()  # Redraw to show the new damage
+            self.my_view.mark_cell(c, r, self.my_board.grid[r][c])  # Show the new damage
             self.update_status()  # Update status to "Your Turn"
 
         elif msg_type == "GAME_OVER":
@@ -530,6 +526,68 @@ class BattleshipGame_Client(tk.Tk):
                 messagebox.showinfo("Game Over", f"{winner} Wins!")
             self.destroy()
 
+    def negotiate_resumed(self, message):
+        """Common start of STATE and RESUMED: the new connection is ours, so pick its encoding."""
+        self.reattaching = False
+        self.received = message['seq']
+        if PROTOCOL_BINARY in message.get('protocols', []):
+            self.send_to_server({"type": "HELLO", "protocol": PROTOCOL_BINARY})
+            self.wire_protocol = PROTOCOL_BINARY
+
+    def resend_placement(self, message):
+        """Sends our fleet again if the server never got it. Returns True if we are still placing."""
+        if message['phase'] != 'Placement' or message['placement_done']:
+            return False
+        if self.my_board.ships_placed_count == len(SHIP_SIZES):
+            self.send_to_server({"type": "PLACEMENT_DONE", "fleet": pack_fleet(self.my_board.ships)})
+        return True
+
+    def apply_resume(self, message):
+        """Catches up after a dropped connection by handling the messages it missed."""
+        self.negotiate_resumed(message)
+        self.resend_placement(message)
+        self.received -= len(message['messages'])  # Counted again as they are replayed
+        for missed in message['messages']:
+            self.handle_server_message(missed)
+            if missed.get('type') == "GAME_OVER":
+                return  # The window is gone
+        if self.game_phase == 'Attack':
+            self.my_turn = message['turn']
+            if self.my_turn:
+                self.opponent_canvas.bind('<Button-1>', self.canvas_click)
+            else:
+                self.opponent_canvas.unbind('<Button-1>')
+        self.update_status()
+
+    def apply_state(self, message):
+        """Resynchronizes with the server's copy of the game after a reattach."""
+        self.negotiate_resumed(message)
+        self.player_name = message['name']
+        self.session_token = message['token']
+
+        if self.resend_placement(message):
+            # Carry on placing if the fleet is not complete yet
+            self.update_status()
+            return
+
+        board = PlayerBoard("MyBoard")
+        board.ships = message['ships']
+        board.grid = message['grid']
+        board.ships_placed_count = board.current_ship_index = len(board.ships)
+        board.build_index()
+        for r, cells in enumerate(message['shots']):
+            for c, shot in enumerate(cells):
+                if shot:
+                    board.record_shot(c, r, 'Hit' if shot == 'H' else 'Miss')
+        self.my_board = board
+
+        if message['phase'] == 'Attack':
+            self.handle_server_message({"type": "START_ATTACK", "turn": message['turn']})
+        else:
+            self.game_phase = "Waiting"
+            self.draw_my_board()
+            self.update_status()
+
     # --- Event Handlers ---
 
     def canvas_move(self, event):
@@ -540,23 +598,11 @@ class BattleshipGame_Client(tk.Tk):
         c, r = self.get_grid_coords(event.x, event.y)
 
         if self.my_board.current_ship_index >= len(SHIP_SIZES):
-            self.ship_canvas.delete("ghost")
+            self.my_view.hide_ghost()
             return
 
         current_size = SHIP_SIZES[self.my_board.current_ship_index]
-        is_valid = self.my_board.is_valid_placement(current_size, c, r, self.current_ship_orientation)
-
-        self.ship_canvas.delete("ghost")
-        # Redraw ships *first* to clear old ghost
-        self.draw_my_board()
-
-        x1, y1 = c * SQUARE_SIZE, r * SQUARE_SIZE
-        width = SQUARE_SIZE * current_size if self.current_ship_orientation == 'H' else SQUARE_SIZE
-        height = SQUARE_SIZE if self.current_ship_orientation == 'H' else SQUARE_SIZE * current_size
-        x2, y2 = x1 + width, y1 + height
-
-        color = 'green' if is_valid else 'red'
-        self.ship_canvas.create_rectangle(x1, y1, x2, y2, outline=color, width=3, tags="ghost")
+        self.my_view.show_ghost(self.my_board, current_size, c, r, self.current_ship_orientation)
 
     def canvas_click(self, event):
         c, r = self.get_grid_coords(event.x, event.y)
@@ -577,6 +623,7 @@ class BattleshipGame_Client(tk.Tk):
 
         if self.my_board.is_valid_placement(current_size, c, r, self.current_ship_orientation):
             self.my_board.add_ship(current_size, c, r, self.current_ship_orientation)
+            self.my_view.hide_ghost()
             self.draw_my_board()
             self.update_status()
 
@@ -588,11 +635,7 @@ class BattleshipGame_Client(tk.Tk):
                 self.ship_canvas.unbind('<Button-1>')
 
                 # Send final board to server
-                self.send_to_server({
-                    "type": "PLACEMENT_DONE",
-                    "ships": self.my_board.ships,
-                    "grid": self.my_board.grid
-                })
+                self.send_to_server({"type": "PLACEMENT_DONE", "fleet": pack_fleet(self.my_board.ships)})
         else:
             self.status_var.set("Invalid Placement! Try again.")
             self.status_label.config(fg='red')
@@ -636,6 +679,7 @@ class BattleshipGame_Client(tk.Tk):
             self.status_var.set("Waiting for opponent...")
 
     def on_closing(self):
+        self.session_token = None  # Closing the window is not a dropped connection
         if self.sock:
             self.sock.close()
         self.destroy()
@@ -652,7 +696,7 @@ class MainMenu(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Battleship - Main Menu")
-        self.geometry("450x300")
+        self.geometry("450x360")
 
         label = tk.Label(self, text="BATTLESHIP", font=('Arial', 24, 'bold'))
         label.pack(pady=20)
@@ -666,6 +710,14 @@ class MainMenu(tk.Tk):
         pve_button = tk.Button(self, text="Play vs. Bot (PvE)", font=('Arial', 14), command=self.launch_pve, height=2)
         pve_button.pack(pady=10, padx=20, fill='x')
 
+        bot_frame = tk.Frame(self)
+        bot_frame.pack(pady=5)
+        tk.Label(bot_frame, text="Bot:", font=('Arial', 12)).pack(side=tk.LEFT)
+        self.bot_strategy = tk.StringVar(self, 'random')
+        for text, strategy in (("Random", 'random'), ("Hunter", 'probability')):
+            tk.Radiobutton(bot_frame, text=text, value=strategy, variable=self.bot_strategy,
+                           font=('Arial', 12)).pack(side=tk.LEFT, padx=5)
+
     def launch_pvp(self):
         """Launches the online client."""
         # This menu (self) is a valid parent for the dialog
@@ -683,8 +735,9 @@ class MainMenu(tk.Tk):
 
     def launch_pve(self):
         """Launches the local bot game."""
+        bot_strategy = self.bot_strategy.get()
         self.destroy()
-        game = BattleshipGame_PvE()
+        game = BattleshipGame_PvE(bot_strategy)
         game.mainloop()
 
 
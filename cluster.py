@@ -0,0 +1,672 @@
+import argparse
+import array
+import asyncio
+import collections
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from common import encode_message, decode_message, FrameDecoder
+from journal import Journal
+from metrics import serve_metrics
+from persistence import RoomStore
+from server import (
+    AsyncServer, GameServer, Lobby, StreamConnection, HOST, PORT, BACKLOG, READ_BUFFER_SIZE, METRICS_HOST,
+    CHECKPOINT_INTERVAL, add_send_options, send_limits, print_banner
+)
+
+# Multi-process server: a supervisor process and one asyncio worker per core.
+#
+# The supervisor owns the listening socket and the lobby. It reads what a
+# waiting connection sends, so a RESUME, REATTACH or SPECTATE goes straight
+# to the worker that has the game, and hands each pair it makes to the
+# worker with the fewest rooms; a game never spans two processes. Workers
+# are AsyncServers that get their sockets over a Unix socket pair
+# (SCM_RIGHTS) instead of accepting them. Over the same channel they report
+# the rooms they open and close, with their session tokens, and the
+# connections back in their own lobby (the partner of a dissolved pairing,
+# a failed RESUME), which the supervisor pairs like its own. Control
+# messages are JSON datagrams, queued rather than waited on when the other
+# end is behind; client bytes not yet dispatched travel with the socket as
+# hex.
+
+CHANNEL_BUFFER = 65536  # Largest control message
+HANDOFF_LIMIT = 16 * 1024  # Undispatched client bytes a handed-over socket may carry
+MOVE_AFTER = 1.0  # Seconds waiters held by different workers wait before one is moved
+WORKER_EXIT_TIMEOUT = 5  # Seconds a worker gets to save its rooms after the supervisor stops
+
+
+# --- Control Channel ---
+class ControlChannel:
+    """One end of a control channel: a SOCK_SEQPACKET socket whose sends never block.
+
+    A message the peer has no room for yet is queued, with duplicates of the
+    descriptors it hands over, and sent from the event loop when the channel
+    drains. A supervisor and a worker both busy reporting to each other would
+    otherwise each wait in send() for the other to read.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.outgoing = collections.deque()  # (payload, fds) not sent yet; the fds are ours to close
+        self.loop = None
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def _send(self, payload, fds):
+        # socket.send_fds would do, but it ignores flags before Python 3.12
+        ancdata = [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array('i', fds))] if fds else []
+        self.sock.sendmsg([payload], ancdata, socket.MSG_DONTWAIT)
+
+    def send(self, message, sockets=()):
+        """Sends one control message, and the sockets it hands over; the caller may close them at once."""
+        payload = json.dumps(message).encode('utf-8')
+        if not self.outgoing:
+            try:
+                self._send(payload, [sock.fileno() for sock in sockets])
+                return
+            except BlockingIOError:
+                self.loop = asyncio.get_running_loop()
+                self.loop.add_writer(self.sock, self.flush)
+            except OSError:
+                return  # The peer is gone; the reader sees EOF
+        self.outgoing.append((payload, [os.dup(sock.fileno()) for sock in sockets]))
+
+    def flush(self):
+        """Sends queued messages, in order, until the channel is full again or the queue is empty."""
+        while self.outgoing:
+            payload, fds = self.outgoing[0]
+            try:
+                self._send(payload, fds)
+            except BlockingIOError:
+                return
+            except OSError:
+                self.discard()  # As above; nothing queued can be delivered now
+                break
+            self.outgoing.popleft()
+            for fd in fds:
+                os.close(fd)
+        self.loop.remove_writer(self.sock)
+
+    def discard(self):
+        """Drops what is still queued, closing the descriptors it would have handed over."""
+        while self.outgoing:
+            for fd in self.outgoing.popleft()[1]:
+                os.close(fd)
+
+    def receive(self):
+        """Yields (message, sockets) for each control message already waiting; (None, []) once the peer is gone."""
+        while True:
+            fds = array.array('i')
+            try:
+                # socket.recv_fds would do, but it ignores flags before Python 3.12
+                data, ancdata, _, _ = self.sock.recvmsg(CHANNEL_BUFFER, socket.CMSG_LEN(2 * fds.itemsize),
+                                                        socket.MSG_DONTWAIT)
+            except BlockingIOError:
+                return
+            if not data:
+                yield None, []
+                return
+            for level, kind, fd_data in ancdata:
+                if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                    fds.frombytes(fd_data[:len(fd_data) - len(fd_data) % fds.itemsize])
+            yield json.loads(data), [socket.socket(fileno=fd) for fd in fds]
+
+    def close(self):
+        self.discard()
+        self.sock.close()
+
+
+def worker_path(path, index):
+    """Each worker checkpoints to its own SQLite file: games.db -> games-0.db, games-1.db, ..."""
+    root, ext = os.path.splitext(path)
+    return f"{root}-{index}{ext}"
+
+
+# --- Worker ---
+class WorkerLobby(Lobby):
+    """A worker's own lobby; every connection waiting in it is reported to the supervisor.
+
+    Two waiters here are still paired locally. Otherwise the supervisor
+    pairs a waiter by its id with a new connection, or asks for it back.
+    """
+
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+        self.held = {}  # id -> connection
+        self.held_ids = {}  # connection -> id
+        self.next_id = itertools.count(1)
+
+    def join(self, client, compatible=None):
+        pair = super().join(client, compatible)
+        if pair is None:
+            held_id = next(self.next_id)
+            self.held[held_id] = client
+            self.held_ids[client] = held_id
+            self.server.report({"cmd": "waiting", "id": held_id, "carried": self.server.carried.get(client)})
+        else:
+            self.leave(pair[0])
+        return pair
+
+    def leave(self, client):
+        super().leave(client)
+        held_id = self.held_ids.pop(client, None)
+        if held_id is not None:
+            del self.held[held_id]
+            self.server.report({"cmd": "left", "id": held_id})
+
+    def take(self, held_id):
+        """Removes a waiter the supervisor asked for; None if it left meanwhile (its 'left' is on the way)."""
+        client = self.held.pop(held_id, None)
+        if client is not None:
+            del self.held_ids[client]
+            super().leave(client)
+        return client
+
+
+class WorkerServer(AsyncServer):
+    """An AsyncServer fed connections by the supervisor instead of a listening socket."""
+
+    def __init__(self, index, count, channel, verbose=False, journal=None, store=None, limits=None):
+        super().__init__(verbose, journal, store, limits)
+        self.index = index
+        self.count = count
+        self.channel = ControlChannel(channel)
+        self.lobby = WorkerLobby(self)
+        self.adopted = set()  # Connections routed here whose first message must be handled here
+        self.tasks = set()  # A task serving a handed-over socket is referenced from nowhere else
+        self.number_rooms_after(0)
+
+    def number_rooms_after(self, last):
+        """Interleaves room ids across workers (worker 0 of 4 gets 1, 5, 9, ...) so they are unique."""
+        self.room_ids = itertools.count(last + 1 + (self.index - last) % self.count, self.count)
+
+    def start(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def report(self, message, sockets=()):
+        self.channel.send(message, sockets)
+
+    def report_room(self, room):
+        self.report({"cmd": "room", "room": room.room_id, "tokens": list(room.tokens.values())})
+
+    def open_room(self, pair):
+        room = super().open_room(pair)
+        self.report_room(room)
+        return room
+
+    def close_room(self, room):
+        super().close_room(room)
+        self.report({"cmd": "closed", "room": room.room_id, "tokens": list(room.tokens.values())})
+
+    def restore_rooms(self):
+        restored = super().restore_rooms()
+        self.number_rooms_after(max(self.rooms, default=0))
+        return restored
+
+    def forget_carried(self, token):
+        super().forget_carried(token)
+        self.report({"cmd": "forget", "token": token})  # The dead connection may wait elsewhere
+
+    def disconnect(self, client):
+        self.adopted.discard(client)
+        if not self.stopped.done():  # Connections torn down at shutdown keep their seats for the restart
+            super().disconnect(client)
+
+    # --- Routing ---
+    def dispatch(self, client, message):
+        """Sends a connection whose message concerns another worker to the supervisor; returns False then."""
+        if client in self.adopted:
+            self.adopted.discard(client)
+        elif self.elsewhere(client, message):
+            self.metrics.record_receive(message)
+            self.route(client, message)
+            return False
+        return super().dispatch(client, message)
+
+    def elsewhere(self, client, message):
+        """True if a RESUME, REATTACH or SPECTATE names nothing on this worker, so the supervisor should route it."""
+        if client.room is not None and client.room.client_placement_done[client]:
+            return False  # Refused here, as in a single process
+        msg_type = message.get('type')
+        if msg_type in ('RESUME', 'REATTACH'):
+            return message.get('token') not in self.sessions
+        if msg_type == 'SPECTATE':
+            room_id = message.get('room')
+            return room_id not in self.rooms if room_id is not None else not self.games_in_progress()
+        return False
+
+    def route(self, client, message):
+        """Gives a connection up to the supervisor, with the message it sent and anything after it."""
+        self.release(client)
+        data = encode_message(message) + client.decoder.unread()
+        if len(data) <= HANDOFF_LIMIT:  # Otherwise it is just closed
+            self.report({"cmd": "route", "data": data.hex(), "carried": self.carried.pop(client, None)},
+                        [client.writer.get_extra_info('socket')])
+
+    def give(self, held_id):
+        """Hands a waiter back to the supervisor, to be paired with one another worker holds."""
+        client = self.lobby.take(held_id)
+        if client is None:
+            return
+        self.report({"cmd": "lobby", "data": client.decoder.unread().hex(), "carried": self.carried.pop(client, None)},
+                    [client.writer.get_extra_info('socket')])
+        client.shutdown()  # Only closes this process's descriptor; the supervisor has the connection now
+
+    # --- Handed-over Sockets ---
+    async def open_socket(self, sock, handoff):
+        reader, writer = await asyncio.open_connection(sock=sock)
+        client = StreamConnection(reader, writer, self.metrics, self.batch, self.limits)
+        client.decoder.feed(bytes.fromhex(handoff['data']))
+        if handoff['carried']:
+            self.carried[client] = tuple(handoff['carried'])
+        self.metrics.connections_opened += 1
+        self.connections.add(client)
+        return client
+
+    async def pair(self, players, sockets):
+        """Opens a room for a pair the supervisor made of new sockets and/or waiters held here."""
+        handoffs = [player for player in players if 'id' not in player]
+        opened = [await self.open_socket(sock, handoff) for sock, handoff in zip(sockets, handoffs)]
+        new = iter(opened)  # Held waiters are taken only now, after the awaits, so none can leave unnoticed
+        pair = [self.lobby.take(player['id']) if 'id' in player else next(new) for player in players]
+        with self.batch:
+            if None in pair:
+                for client in pair:  # A held waiter left first; the other waits here instead
+                    if client is not None:
+                        self.enqueue(client)
+            else:
+                self.open_room(pair)
+        self.report({"cmd": "paired"})
+        for client in opened:
+            self.start(self.serve_connection(client))
+
+    async def adopt(self, handoff, sock):
+        """Serves a connection the supervisor routed here for a RESUME, REATTACH or SPECTATE."""
+        client = await self.open_socket(sock, handoff)
+        self.adopted.add(client)
+        await self.serve_connection(client)
+
+    def read_channel(self):
+        for message, sockets in self.channel.receive():
+            if message is None:
+                if not self.stopped.done():
+                    self.stopped.set_result(None)  # The supervisor is gone
+                return
+            cmd = message['cmd']
+            if cmd == 'pair':
+                self.start(self.pair(message['players'], sockets))
+            elif cmd == 'adopt':
+                self.start(self.adopt(message, sockets[0]))
+            elif cmd == 'give':
+                self.give(message['id'])
+            elif cmd == 'forget':
+                GameServer.forget_carried(self, message['token'])  # Without reporting it back
+
+    async def serve_channel(self):
+        loop = asyncio.get_running_loop()
+        self.stopped = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: self.stopped.done() or self.stopped.set_result(None))
+        for room in self.rooms.values():
+            self.report_room(room)  # Restored from the state db
+        self.report({"cmd": "ready"})
+        loop.add_reader(self.channel.fileno(), self.read_channel)
+        asyncio.create_task(self.housekeeping(CHECKPOINT_INTERVAL))
+        await self.stopped
+
+
+def run_worker(index, count, channel, args):
+    """A worker process: one WorkerServer until the supervisor closes the channel."""
+    journal = Journal(args.journal, run=args.run + index) if args.journal else None
+    store = RoomStore(worker_path(args.state_db, index)) if args.state_db else None
+    server = WorkerServer(index, count, channel, verbose=args.verbose, journal=journal, store=store,
+                          limits=args.limits)
+    if store is not None:
+        print(f"[WORKER {index}] Restored {server.restore_rooms()} game(s) from {worker_path(args.state_db, index)}")
+    if args.metrics_port:
+        serve_metrics(server.metrics, METRICS_HOST, args.metrics_port + index)
+    try:
+        asyncio.run(server.serve_channel())
+    finally:
+        if journal:
+            journal.close()
+        if store is not None:
+            store.save(*server.take_checkpoint())
+            store.close()
+
+
+# --- Supervisor ---
+class Waiter:
+    """A connection in the supervisor's lobby, read here until a worker gets it."""
+
+    def __init__(self, sock, carried=None):
+        self.sock = sock
+        self.decoder = FrameDecoder(READ_BUFFER_SIZE)
+        self.carried = carried  # (token, sent_count) from a dissolved room, as in GameServer.carried
+        self.worker = None
+
+
+class HeldWaiter:
+    """A connection waiting in a worker's lobby; only its id is known here."""
+
+    def __init__(self, worker, held_id, carried):
+        self.worker = worker
+        self.held_id = held_id
+        self.carried = carried
+
+
+class WorkerHandle:
+    def __init__(self, index, process, channel):
+        self.index = index
+        self.process = process
+        self.channel = ControlChannel(channel)
+        self.rooms = 0  # Open rooms it reported
+        self.pending = 0  # Pairs sent that it has not opened yet
+        self.alive = True
+
+
+def can_pair(waiter, newcomer):
+    """Two waiters can share a game if at most one is held by a worker, or both by the same one."""
+    return waiter.worker is None or newcomer.worker is None or waiter.worker is newcomer.worker
+
+
+class Supervisor:
+    """Accepts connections, pairs them, and routes each game and session to its worker."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.lobby = Lobby()
+        self.held = {}  # (worker index, id) -> HeldWaiter
+        self.sessions = {}  # session token -> WorkerHandle
+        self.rooms = {}  # room_id -> WorkerHandle
+
+    def send(self, waiter, message):
+        try:
+            waiter.sock.send(encode_message(message))
+        except OSError:
+            pass  # A dead connection shows up as EOF on the next read
+
+    # --- Lobby ---
+    def accept(self, listener):
+        while True:
+            try:
+                sock, _ = listener.accept()
+            except BlockingIOError:
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            waiter = Waiter(sock)
+            self.loop.add_reader(sock, self.read_waiter, waiter)
+            self.join(waiter)
+
+    def join(self, waiter):
+        """Queues a waiter; returns True if that paired it (and it is gone) at once."""
+        pair = self.lobby.join(waiter, can_pair)
+        if pair is None:
+            if waiter.worker is None:
+                self.send(waiter, {"type": "LOBBY", "message": "Waiting for an opponent...", **self.lobby.stats()})
+            return False
+        self.start_game(*pair)
+        return True
+
+    def start_game(self, first, second):
+        """Sends a pair to the worker holding one of them, or else to the least loaded worker."""
+        worker = first.worker or second.worker or min((w for w in self.workers if w.alive),
+                                                      key=lambda w: w.rooms + w.pending)
+        players, sockets = [], []
+        for waiter in (first, second):
+            if waiter.worker is not None:
+                del self.held[(waiter.worker.index, waiter.held_id)]
+                players.append({"id": waiter.held_id})
+            else:
+                self.loop.remove_reader(waiter.sock)
+                players.append({"data": waiter.decoder.unread().hex(), "carried": waiter.carried})
+                sockets.append(waiter.sock)
+        worker.pending += 1
+        worker.channel.send({"cmd": "pair", "players": players}, sockets)
+        for sock in sockets:
+            sock.close()
+
+    def drop(self, waiter):
+        self.loop.remove_reader(waiter.sock)
+        self.lobby.leave(waiter)
+        waiter.sock.close()
+
+    def read_waiter(self, waiter):
+        try:
+            received = waiter.decoder.recv_into(waiter.sock)
+        except BlockingIOError:
+            return
+        except OSError:
+            received = 0
+        if not received or waiter.decoder.end - waiter.decoder.start > HANDOFF_LIMIT:
+            self.drop(waiter)
+            return
+        self.read_frames(waiter)
+
+    def read_frames(self, waiter):
+        """Acts on what a waiting connection sent; drops it if that is malformed, as a worker would."""
+        try:
+            self.route_frames(waiter)
+        except Exception as e:  # A bad frame header or payload, or a token or room id of the wrong type
+            print(f"[SERVER] Error handling client: {e}")
+            self.drop(waiter)
+
+    def route_frames(self, waiter):
+        """Routes a RESUME, REATTACH or SPECTATE to the worker with its game; ignores the rest."""
+        for payload in waiter.decoder.frames():
+            message = decode_message(payload)
+            if not isinstance(message, dict):
+                raise ValueError("Message is not an object")
+            msg_type = message.get('type')
+            if msg_type in ('RESUME', 'REATTACH'):
+                if not isinstance(message.get('token'), (str, type(None))):
+                    raise ValueError("Session token is not a string")
+                worker = self.sessions.get(message.get('token'))
+                if worker is None:
+                    self.send(waiter, {"type": "RESUME_FAILED", "message": "No game in progress for that session."})
+                    self.forget(message.get('token'))
+                    self.lobby.leave(waiter)
+                    waiter.carried = None  # A new player, numbered from the start as in GameServer.claim_seat
+                    if self.join(waiter):  # Carry on as a new player
+                        return
+                    continue
+            elif msg_type == 'SPECTATE':
+                room_id = message.get('room')
+                if not isinstance(room_id, (int, type(None))):
+                    raise ValueError("Room id is not an integer")
+                if room_id is None:
+                    worker = self.rooms[min(self.rooms)] if self.rooms else None  # The oldest game
+                else:
+                    worker = self.rooms.get(room_id)
+                if worker is None:
+                    self.lobby.leave(waiter)  # For good, as in a single process
+                    waiter.carried = None
+                    self.send(waiter, {"type": "SPECTATE_FAILED", "message": "No such game in progress."})
+                    continue
+            else:
+                continue  # Nothing else means anything before a game starts
+            self.lobby.leave(waiter)
+            self.loop.remove_reader(waiter.sock)
+            data = encode_message(message) + waiter.decoder.unread()
+            worker.channel.send({"cmd": "adopt", "data": data.hex(), "carried": waiter.carried},
+                                [waiter.sock])
+            waiter.sock.close()
+            return
+
+    def forget(self, token):
+        """Takes waiters carried under `token` out of the lobby; see GameServer.forget_carried."""
+        for waiter in list(self.lobby.waiting):
+            if waiter.carried and waiter.carried[0] == token:
+                self.lobby.leave(waiter)
+                if waiter.worker is not None:
+                    del self.held[(waiter.worker.index, waiter.held_id)]
+                    waiter.worker.channel.send({"cmd": "forget", "token": token})
+
+    def unstick(self):
+        """Moves a waiter here when the only ones left are held by different workers.
+
+        Held waiters are normally paired with the next new connection; this
+        covers a lull. A waiter that has sat for MOVE_AFTER is not sending
+        anything, so none of its bytes are left behind in the worker.
+        """
+        if len(self.lobby.waiting) < 2:
+            return  # Two compatible waiters would have been paired
+        if time.monotonic() - next(iter(self.lobby.waiting.values())) < MOVE_AFTER:
+            return
+        waiter = next(reversed(self.lobby.waiting))
+        self.lobby.leave(waiter)
+        del self.held[(waiter.worker.index, waiter.held_id)]
+        waiter.worker.channel.send({"cmd": "give", "id": waiter.held_id})
+
+    # --- Worker Reports ---
+    def read_channel(self, worker):
+        for message, sockets in worker.channel.receive():
+            if message is None:
+                self.lose_worker(worker)
+                return
+            cmd = message['cmd']
+            if cmd == 'room':
+                worker.rooms += 1
+                self.rooms[message['room']] = worker
+                for token in message['tokens']:
+                    self.sessions[token] = worker
+            elif cmd == 'closed':
+                worker.rooms -= 1
+                self.rooms.pop(message['room'], None)
+                for token in message['tokens']:
+                    if self.sessions.get(token) is worker:
+                        del self.sessions[token]
+            elif cmd == 'paired':
+                worker.pending -= 1
+            elif cmd == 'ready':
+                self.starting.discard(worker)
+                if not self.starting:
+                    self.ready.set_result(None)
+            elif cmd == 'waiting':
+                waiter = HeldWaiter(worker, message['id'], message['carried'])
+                self.held[(worker.index, waiter.held_id)] = waiter
+                self.join(waiter)
+            elif cmd == 'left':
+                waiter = self.held.pop((worker.index, message['id']), None)
+                if waiter is not None:
+                    self.lobby.leave(waiter)
+            elif cmd == 'forget':
+                self.forget(message['token'])
+            elif cmd in ('route', 'lobby'):
+                # A connection that wants a game on another worker, or a waiter sent back by unstick()
+                sockets[0].setblocking(False)
+                waiter = Waiter(sockets[0], message['carried'])
+                waiter.decoder.feed(bytes.fromhex(message['data']))
+                self.loop.add_reader(waiter.sock, self.read_waiter, waiter)
+                if cmd == 'route' or not self.join(waiter):
+                    self.read_frames(waiter)
+
+    def lose_worker(self, worker):
+        print(f"[SERVER] Worker {worker.index} exited; its games are lost.")
+        worker.alive = False
+        self.loop.remove_reader(worker.channel)
+        for key, waiter in list(self.held.items()):
+            if waiter.worker is worker:
+                del self.held[key]
+                self.lobby.leave(waiter)
+        self.sessions = {token: w for token, w in self.sessions.items() if w is not worker}
+        self.rooms = {room_id: w for room_id, w in self.rooms.items() if w is not worker}
+        self.starting.discard(worker)
+        if not any(w.alive for w in self.workers):
+            self.stopped.set_result(None)
+        elif not self.starting and not self.ready.done():
+            self.ready.set_result(None)
+
+    def status_line(self):
+        stats = self.lobby.stats()
+        rooms = ", ".join(str(worker.rooms) for worker in self.workers)
+        return (f"[SERVER] Rooms: {len(self.rooms)} ({rooms}) | Lobby queue: {stats['queue_depth']} | "
+                f"Average wait: {stats['average_wait']}s")
+
+    async def report_status(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.status_line())
+
+    async def housekeeping(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.unstick()
+
+    async def serve(self, host, port, report_interval):
+        self.loop = asyncio.get_running_loop()
+        self.stopped = self.loop.create_future()
+        self.loop.add_signal_handler(signal.SIGTERM, lambda: self.stopped.done() or self.stopped.set_result(None))
+        self.ready = self.loop.create_future()
+        self.starting = set(self.workers)
+        for worker in self.workers:
+            self.loop.add_reader(worker.channel, self.read_channel, worker)
+        # Not listening until every worker has reported its restored rooms, or a REATTACH would find none
+        await asyncio.wait([self.ready, self.stopped], return_when=asyncio.FIRST_COMPLETED)
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((host, port))
+        listener.listen(BACKLOG)
+        listener.setblocking(False)
+        self.loop.add_reader(listener, self.accept, listener)
+        if report_interval:
+            asyncio.create_task(self.report_status(report_interval))
+        asyncio.create_task(self.housekeeping(MOVE_AFTER))
+        await self.stopped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Battleship game server on every core: "
+                                                 "a supervisor process and asyncio worker processes.")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: cores).")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--verbose', action='store_true', help="Log every move.")
+    parser.add_argument('--report-interval', type=float, default=60,
+                        help="Seconds between room/lobby status lines (0 disables).")
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help=f"Serve worker K's metrics at http://{METRICS_HOST}:PORT+K/metrics (0 disables).")
+    parser.add_argument('--journal', metavar='DIR', help="Record every game's events to segment files in DIR.")
+    parser.add_argument('--state-db', metavar='PATH',
+                        help="Checkpoint each worker's rooms to PATH with its index added, e.g. games-0.db; "
+                             "restart with the same --workers to resume them.")
+    add_send_options(parser)
+    args = parser.parse_args()
+    args.limits = send_limits(parser, args)
+    args.run = int(time.time() * 1000)  # Journal run of worker K is this plus K
+
+    print_banner(args.port)
+    # Spawned, not forked: a worker inherits only its own end of its channel, so it sees EOF when the supervisor exits
+    context = multiprocessing.get_context('spawn')
+    workers = []
+    for index in range(args.workers):
+        channel, worker_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        process = context.Process(target=run_worker, args=(index, args.workers, worker_end, args))
+        process.start()
+        worker_end.close()
+        workers.append(WorkerHandle(index, process, channel))
+    print(f"Started {args.workers} worker process(es)")
+    if args.metrics_port:
+        print(f"Metrics at http://{METRICS_HOST}:{args.metrics_port}-{args.metrics_port + args.workers - 1}/metrics")
+    try:
+        asyncio.run(Supervisor(workers).serve(args.host, args.port, args.report_interval))
+    finally:
+        for worker in workers:
+            worker.channel.close()  # Each worker saves its rooms and exits
+        for worker in workers:
+            worker.process.join(WORKER_EXIT_TIMEOUT)
+            if worker.process.is_alive():
+                worker.process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
-import tkinter as tk
+import json
+import random
+import struct
+from collections import namedtuple
 
 # --- Configuration ---
 GRID_SIZE = 10
@@ -16,21 +19,42 @@ SHIP_COLORS = {
 
 # --- Game State Class ---
 class PlayerBoard:
-    """Manages the state and data for a single player's board."""
+    """Manages the state and data for a single player's board.
 
-    def __init__(self, name):
+    Ship occupancy, hits, misses and each ship's cells are integer masks
+    (bit = row * grid_size + col), so a placement check or a shot is a
+    couple of mask operations. grid mirrors them as the nested lists the
+    GUI draws and snapshots store.
+    """
+
+    def __init__(self, name, grid_size=GRID_SIZE):
         self.name = name
+        self.grid_size = grid_size
         self.ships = []
-        self.grid = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]
-        self.shots_fired = [[0] * GRID_SIZE for _ in range(GRID_SIZE)]
+        self.grid = [[0] * grid_size for _ in range(grid_size)]
+        self.shots_fired = [[0] * grid_size for _ in range(grid_size)]
+        self.unfired = list(range(grid_size * grid_size))  # Cells not yet fired at, in any order
+        self._unfired_pos = list(range(grid_size * grid_size))  # cell -> its index in self.unfired
+        self.ship_masks = []  # Cells each ship covers, per ship (bit = row * grid_size + col)
+        self.ship_at = {}  # row * grid_size + col -> index into self.ships
+        self.occupied = 0  # Cells holding a ship
+        self.hits = 0  # Ship cells that have been hit
+        self.misses = 0  # Cells whose shot came back a Miss
         self.ships_placed_count = 0
         self.ships_sunk_count = 0
         self.current_ship_index = 0
 
     def add_ship(self, size, col, row, orientation):
-        """Adds a ship to the board and updates the grid."""
+        """Adds a ship to the board and updates the grid.
+
+        Raises ValueError for a ship that leaves the board or overlaps one
+        already placed; check is_valid_placement first.
+        """
         # Note: In the network version, the client GUI will do this
         # and the server will validate and store it.
+        placement = placement_lookup(size, self.grid_size).get((col, row, orientation))
+        if placement is None or placement.mask & self.occupied:
+            raise ValueError(f"Invalid placement for a ship of size {size} at ({col}, {row}, {orientation})")
         self.ships.append({
             'size': size,
             'col': col,
@@ -38,55 +62,376 @@ class PlayerBoard:
             'orientation': orientation,
             'hits': 0
         })
-        for i in range(size):
-            r = row + i if orientation == 'V' else row
-            c = col + i if orientation == 'H' else col
-            self.grid[r][c] = 1
+        for cell in placement.cells:
+            self.grid[cell // self.grid_size][cell % self.grid_size] = 1
+        self._index_ship(len(self.ships) - 1)
         self.ships_placed_count += 1
         self.current_ship_index += 1
 
-    def receive_shot(self, col, row):
-        """Processes an incoming shot and returns 'Hit' or 'Miss'."""
-        if self.grid[row][col] == 1:
-            self.grid[row][col] = 'H'  # Mark as Hit
+    def _index_ship(self, index):
+        """Records which cells belong to a ship and adds them to the occupancy mask."""
+        ship = self.ships[index]
+        placement = placement_lookup(ship['size'], self.grid_size)[(ship['col'], ship['row'], ship['orientation'])]
+        for cell in placement.cells:
+            self.ship_at[cell] = index
+        self.ship_masks.append(placement.mask)
+        self.occupied |= placement.mask
+
+    def build_index(self):
+        """Rebuilds the masks and cell-to-ship index after self.ships and self.grid were assigned directly."""
+        self.ship_masks = []
+        self.ship_at = {}
+        self.occupied = 0
+        for index in range(len(self.ships)):
+            self._index_ship(index)
+        self.hits = self.misses = 0
+        for r, cells in enumerate(self.grid):
+            for c, cell in enumerate(cells):
+                if cell == 'H' or cell == 'M':
+                    bit = 1 << (r * self.grid_size + c)
+                    if cell == 'M':
+                        self.misses |= bit
+                    if bit & self.occupied:  # A ship cell shown as 'M' was hit, then fired at again
+                        self.hits |= bit
+        self.ships_sunk_count = sum(1 for mask in self.ship_masks if self.hits & mask == mask)
 
-            for ship in self.ships:
-                r_start, c_start = ship['row'], ship['col']
-                s_size, s_orient = ship['size'], ship['orientation']
+    def all_ships_sunk(self):
+        """Returns True once every placed ship has been sunk."""
+        return self.ships_sunk_count == len(self.ships)
 
-                is_this_ship = False
-                if s_orient == 'H' and r_start == row and c_start <= col < c_start + s_size:
-                    is_this_ship = True
-                elif s_orient == 'V' and c_start == col and r_start <= row < r_start + s_size:
-                    is_this_ship = True
+    def record_shot(self, col, row, result):
+        """Records the result of a shot this player fired at the opponent."""
+        self.shots_fired[row][col] = 'H' if result in ('Hit', 'Sunk') else 'M'
 
-                if is_this_ship:
-                    ship['hits'] += 1
-                    if ship['hits'] == s_size:
-                        self.ships_sunk_count += 1
-                        return 'Sunk', True
-                    return 'Hit', False
+        # Swap-remove the cell from the unfired pool
+        cell = row * self.grid_size + col
+        pos = self._unfired_pos[cell]
+        if pos < 0:
+            return
+        last = self.unfired.pop()
+        if last != cell:
+            self.unfired[pos] = last
+            self._unfired_pos[last] = pos
+        self._unfired_pos[cell] = -1
 
+    def random_unfired_cell(self, rng=random):
+        """Returns a uniformly random (col, row) this player has not fired at yet."""
+        cell = self.unfired[rng.randrange(len(self.unfired))]
+        return cell % self.grid_size, cell // self.grid_size
+
+    def receive_shot(self, col, row):
+        """Processes an incoming shot and returns ('Hit', False), ('Sunk', True) or ('Miss', False).
+
+        A cell that was already hit counts as a Miss, as it always has.
+        """
+        cell = row * self.grid_size + col
+        bit = 1 << cell
+        if bit & self.occupied and not bit & self.hits:
+            self.hits |= bit
+            self.grid[row][col] = 'H'  # Mark as Hit
+            index = self.ship_at[cell]
+            self.ships[index]['hits'] += 1
+            mask = self.ship_masks[index]
+            if self.hits & mask == mask:
+                self.ships_sunk_count += 1
+                return 'Sunk', True
             return 'Hit', False
-        else:
-            self.grid[row][col] = 'M'
-            return 'Miss', False
+        self.misses |= bit
+        self.grid[row][col] = 'M'
+        return 'Miss', False
 
     def is_valid_placement(self, size, col, row, orientation):
         """Checks for boundary and collision."""
-        end_col = col + (size - 1) if orientation == 'H' else col
-        end_row = row + (size - 1) if orientation == 'V' else row
+        placement = placement_lookup(size, self.grid_size).get((col, row, orientation))
+        return placement is not None and not placement.mask & self.occupied
+
+
+# --- Bitboard Helpers ---
+def ship_mask(size, col, row, orientation, grid_size=GRID_SIZE):
+    """Returns the bitboard mask a ship covers, or 0 if it leaves the board."""
+    if orientation == 'H':
+        if not (0 <= row < grid_size and 0 <= col and col + size <= grid_size):
+            return 0
+        return ((1 << size) - 1) << (row * grid_size + col)
+
+    if not (0 <= col < grid_size and 0 <= row and row + size <= grid_size):
+        return 0
+    mask = 0
+    for i in range(size):
+        mask |= 1 << ((row + i) * grid_size + col)
+    return mask
+
+
+def on_board(col, row, grid_size=GRID_SIZE):
+    """True if col and row are ints naming a cell of the board; anything a client sends as a shot is checked."""
+    return type(col) is int and type(row) is int and 0 <= col < grid_size and 0 <= row < grid_size
+
+
+# --- Placement Index ---
+# Every in-bounds placement of a ship, enumerated once per (grid size, ship
+# size) on first use and shared by placement checks, fleet generation and
+# the bots. cells are row * grid_size + col, in order along the ship.
+Placement = namedtuple('Placement', ['col', 'row', 'orientation', 'mask', 'cells'])
+
+_placements = {}  # (grid_size, size) -> list of Placement
+_placement_lookups = {}  # (grid_size, size) -> {(col, row, orientation): Placement}
+
+
+def placements_for(size, grid_size=GRID_SIZE):
+    """Returns every in-bounds placement of a ship of this size (size 1 is listed once)."""
+    key = (grid_size, size)
+    if key not in _placements:
+        placements, lookup = [], {}
+        for orientation in ('H', 'V'):
+            step = 1 if orientation == 'H' else grid_size
+            for row in range(grid_size - (size - 1 if orientation == 'V' else 0)):
+                for col in range(grid_size - (size - 1 if orientation == 'H' else 0)):
+                    start = row * grid_size + col
+                    cells = tuple(range(start, start + size * step, step))
+                    placement = Placement(col, row, orientation, ship_mask(size, col, row, orientation, grid_size),
+                                          cells)
+                    lookup[(col, row, orientation)] = placement
+                    if orientation == 'H' or size > 1:
+                        placements.append(placement)
+        _placements[key] = placements
+        _placement_lookups[key] = lookup
+    return _placements[key]
+
+
+def placement_lookup(size, grid_size=GRID_SIZE):
+    """Maps (col, row, orientation) to its Placement; out-of-bounds spots are absent."""
+    key = (grid_size, size)
+    if key not in _placement_lookups:
+        placements_for(size, grid_size)
+    return _placement_lookups[key]
+
+
+def legal_placements(size, occupied=0, grid_size=GRID_SIZE):
+    """Placements of a ship that stay on the board and clear every cell in `occupied` (e.g. a board's occupied)."""
+    return [placement for placement in placements_for(size, grid_size) if not placement.mask & occupied]
+
+
+# --- Fleet Placement Messages ---
+# PLACEMENT_DONE carries only the fleet, one [size, col, row, orientation]
+# per ship. The server checks the whole fleet against the placement index
+# and builds the board itself, so nothing a client sends is stored as is.
+def pack_fleet(ships):
+    """The PLACEMENT_DONE fleet for a board's ship list."""
+    return [[ship['size'], ship['col'], ship['row'], ship['orientation']] for ship in ships]
+
+
+def message_fleet(message):
+    """The fleet a PLACEMENT_DONE describes, or None if it has none.
+
+    Clients from before the compact form send their ship dicts and grid
+    instead; their fleet is read from the ships and goes through the same
+    checks, and the grid is ignored.
+    """
+    if 'fleet' in message:
+        return message['fleet']
+    try:
+        return pack_fleet(message['ships'])
+    except (LookupError, TypeError):
+        return None
+
+
+def validate_fleet(fleet, ship_sizes=SHIP_SIZES, grid_size=GRID_SIZE):
+    """Checks a client's fleet: exactly the expected ship sizes, all on the board, none overlapping.
+
+    Same rules as placing the ships one by one with is_valid_placement, but
+    with one bitmask test per ship. Returns the canonical Placements in fleet
+    order, or None if anything is wrong, malformed input included.
+    """
+    try:
+        if len(fleet) != len(ship_sizes) or sorted(ship[0] for ship in fleet) != sorted(ship_sizes):
+            return None
+        occupied = 0
+        placements = []
+        for size, col, row, orientation in fleet:
+            placement = placement_lookup(size, grid_size).get((col, row, orientation))
+            if placement is None or placement.mask & occupied:
+                return None
+            occupied |= placement.mask
+            placements.append(placement)
+    except (LookupError, TypeError, ValueError):
+        return None
+    return placements
+
+
+# --- Network Helpers ---
+HEADER_SIZE = 8  # ASCII, left-aligned message length
+MAX_FRAME_SIZE = 1 << 20  # Largest payload a decoder accepts; a bigger length header is a broken or hostile peer
+
+# Wire encodings. Every peer speaks JSON; the server offers the others in
+# GREETING and switches once the client answers with a HELLO naming one.
+PROTOCOL_JSON = 'json'
+PROTOCOL_BINARY = 'bin1'
+SUPPORTED_PROTOCOLS = [PROTOCOL_JSON, PROTOCOL_BINARY]
+
+# Server messages that are not part of a seat's numbered stream; RESUME's "seq" counts all the others
+UNSEQUENCED_MESSAGES = {'LOBBY', 'STATE', 'RESUMED', 'RESUME_FAILED'}
+
+# Binary payloads start with a type byte; JSON payloads always start with '{'.
+BIN_SHOT = 1
+BIN_SHOT_RESULT = 2
+BIN_OPPONENT_SHOT = 3
+BIN_YOUR_TURN = 4
+BIN_OPPONENT_TURN = 5
+BIN_PLACEMENT = 6
+
+RESULT_CODES = {'Miss': 0, 'Hit': 1, 'Sunk': 2}
+RESULT_NAMES = ['Miss', 'Hit', 'Sunk']
 
-        if not (0 <= col < GRID_SIZE and 0 <= row < GRID_SIZE and
-                0 <= end_col < GRID_SIZE and 0 <= end_row < GRID_SIZE):
-            return False
+SHOT_FRAME = struct.Struct('!BBB')  # type, col, row
+RESULT_FRAME = struct.Struct('!BBBBB')  # type, col, row, result, sunk_count
+TURN_FRAME = struct.Struct('!B')  # type
+PLACEMENT_HEADER = struct.Struct('!BB')  # type, ship count
+PLACEMENT_SHIP = struct.Struct('!BBBB')  # size, col, row, 0 = 'H' / 1 = 'V'
 
-        for i in range(size):
-            r = row + i if orientation == 'V' else row
-            c = col + i if orientation == 'H' else col
-            if self.grid[r][c] != 0:
-                return False
-        return True
+
+def frame(payload):
+    """Prepends the 8-byte length header to an encoded payload."""
+    return f"{len(payload):<{HEADER_SIZE}}".encode('utf-8') + payload
+
+
+def encode_binary(message):
+    """Packs a message into a binary payload, or returns None if it has no binary form."""
+    msg_type = message.get('type')
+    if msg_type == 'SHOT':
+        return SHOT_FRAME.pack(BIN_SHOT, message['col'], message['row'])
+    if msg_type in ('SHOT_RESULT', 'OPPONENT_SHOT'):
+        code = BIN_SHOT_RESULT if msg_type == 'SHOT_RESULT' else BIN_OPPONENT_SHOT
+        return RESULT_FRAME.pack(code, message['col'], message['row'],
+                                 RESULT_CODES[message['result']], message['sunk_count'])
+    if msg_type == 'YOUR_TURN':
+        return TURN_FRAME.pack(BIN_YOUR_TURN)
+    if msg_type == 'OPPONENT_TURN':
+        return TURN_FRAME.pack(BIN_OPPONENT_TURN)
+    if msg_type == 'PLACEMENT_DONE':
+        fleet = message['fleet']
+        parts = [PLACEMENT_HEADER.pack(BIN_PLACEMENT, len(fleet))]
+        for size, col, row, orientation in fleet:
+            parts.append(PLACEMENT_SHIP.pack(size, col, row, 0 if orientation == 'H' else 1))
+        return b''.join(parts)
+    return None
+
+
+def decode_binary(payload):
+    """Unpacks a binary payload into the same dict the JSON form would give."""
+    code = payload[0]
+    if code == BIN_SHOT:
+        _, col, row = SHOT_FRAME.unpack(payload)
+        return {"type": "SHOT", "col": col, "row": row}
+    if code in (BIN_SHOT_RESULT, BIN_OPPONENT_SHOT):
+        _, col, row, result, sunk_count = RESULT_FRAME.unpack(payload)
+        return {"type": "SHOT_RESULT" if code == BIN_SHOT_RESULT else "OPPONENT_SHOT",
+                "col": col, "row": row, "result": RESULT_NAMES[result], "sunk_count": sunk_count}
+    if code == BIN_YOUR_TURN:
+        return {"type": "YOUR_TURN"}
+    if code == BIN_OPPONENT_TURN:
+        return {"type": "OPPONENT_TURN"}
+    if code == BIN_PLACEMENT:
+        _, count = PLACEMENT_HEADER.unpack_from(payload)
+        fleet = []
+        for i in range(count):
+            size, col, row, vertical = PLACEMENT_SHIP.unpack_from(
+                payload, PLACEMENT_HEADER.size + i * PLACEMENT_SHIP.size)
+            fleet.append([size, col, row, 'V' if vertical else 'H'])
+        return {"type": "PLACEMENT_DONE", "fleet": fleet}
+    raise ValueError(f"Unknown binary message type {code}")
+
+
+def encode_message(message, protocol=PROTOCOL_JSON):
+    """Serializes a message and prepends the 8-byte length header.
+
+    With the binary protocol, messages that have no binary form still go as JSON.
+    """
+    if protocol == PROTOCOL_BINARY:
+        payload = encode_binary(message)
+        if payload is not None:
+            return frame(payload)
+    return frame(json.dumps(message).encode('utf-8'))
+
+
+def decode_message(payload):
+    """Decodes one frame payload (bytes or memoryview), whichever encoding it was sent in."""
+    if payload[:1] == b'{':
+        return json.loads(str(payload, 'utf-8'))
+    return decode_binary(payload)
+
+
+class FrameDecoder:
+    """Splits a byte stream into frame payloads.
+
+    Reads land directly in one preallocated bytearray (recv_into, or feed for
+    bytes that arrived another way) and complete frames come back as
+    memoryview slices of it, so several frames from one recv cost no extra
+    syscalls or copies, and a short read that ends mid-header or mid-payload
+    is simply kept until the rest arrives. Unread bytes are moved back to
+    the front when the tail fills up; the buffer only grows for a frame
+    larger than itself. A payload is valid until the next read.
+    """
+
+    def __init__(self, size=65536):
+        self._allocate(size)
+        self.start = 0  # First unread byte
+        self.end = 0  # One past the last byte received
+
+    def _allocate(self, size):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+
+    def _reserve(self, needed):
+        """Makes sure at least `needed` bytes are free after self.end."""
+        if len(self.buffer) - self.end >= needed:
+            return
+        pending = self.end - self.start
+        if pending + needed > len(self.buffer):
+            old = self.view
+            self._allocate(max(len(self.buffer) * 2, pending + needed))
+            self.view[:pending] = old[self.start:self.end]
+        else:
+            self.view[:pending] = self.view[self.start:self.end]
+        self.start, self.end = 0, pending
+
+    def recv_into(self, sock, min_free=1024):
+        """Reads once from a socket into the buffer. Returns the byte count, 0 on EOF."""
+        self._reserve(min_free)
+        n = sock.recv_into(self.view[self.end:])
+        self.end += n
+        return n
+
+    def feed(self, data):
+        """Appends bytes that were read some other way (e.g. an asyncio stream)."""
+        self._reserve(len(data))
+        self.view[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def unread(self):
+        """Returns a copy of the bytes not yet yielded as frames, to hand the stream to another reader."""
+        return bytes(self.view[self.start:self.end])
+
+    def frames(self):
+        """Yields the payload of every complete frame received so far.
+
+        Raises ValueError on a header that is not a length from 0 to
+        MAX_FRAME_SIZE; the stream cannot be resynchronised after that, so
+        the caller should close the connection.
+        """
+        while self.end - self.start >= HEADER_SIZE:
+            length = int(self.buffer[self.start:self.start + HEADER_SIZE])
+            if not 0 <= length <= MAX_FRAME_SIZE:
+                raise ValueError(f"Bad frame length {length}")
+            frame_end = self.start + HEADER_SIZE + length
+            if frame_end > self.end:
+                # Partial payload: make sure the rest will fit, then wait for it
+                self._reserve(frame_end - self.end)
+                return
+            payload = self.view[self.start + HEADER_SIZE:frame_end]
+            self.start = frame_end
+            yield payload
+        if self.start == self.end:
+            self.start = self.end = 0
 
 
 # --- Utility Drawing Functions (for client) ---
@@ -106,18 +451,110 @@ def draw_grid_lines(canvas):
     canvas.configure(scrollregion=(-25, -25, CANVAS_SIZE + 5, CANVAS_SIZE + 5))
 
 
-def draw_hit_marker(canvas, c, r):
+def draw_ship(canvas, ship, tags=()):
+    """Draws one ship as a filled rectangle and returns its canvas item."""
+    c, r = ship['col'], ship['row']
+    size, orientation = ship['size'], ship['orientation']
+
+    x1, y1 = c * SQUARE_SIZE, r * SQUARE_SIZE
+    width = SQUARE_SIZE * size if orientation == 'H' else SQUARE_SIZE
+    height = SQUARE_SIZE if orientation == 'H' else SQUARE_SIZE * size
+    x2, y2 = x1 + width, y1 + height
+
+    color = SHIP_COLORS.get(size, "gray")
+    return canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black", tags=tags)
+
+
+def draw_hit_marker(canvas, c, r, tags=()):
     x1 = c * SQUARE_SIZE
     y1 = r * SQUARE_SIZE
     x2 = x1 + SQUARE_SIZE
     y2 = y1 + SQUARE_SIZE
-    canvas.create_line(x1 + 5, y1 + 5, x2 - 5, y2 - 5, fill='red', width=5)
-    canvas.create_line(x1 + 5, y2 - 5, x2 - 5, y1 + 5, fill='red', width=5)
+    return (canvas.create_line(x1 + 5, y1 + 5, x2 - 5, y2 - 5, fill='red', width=5, tags=tags),
+            canvas.create_line(x1 + 5, y2 - 5, x2 - 5, y1 + 5, fill='red', width=5, tags=tags))
 
 
-def draw_miss_marker(canvas, c, r):
+def draw_miss_marker(canvas, c, r, tags=()):
     x_center = c * SQUARE_SIZE + SQUARE_SIZE // 2
     y_center = r * SQUARE_SIZE + SQUARE_SIZE // 2
     R = SQUARE_SIZE // 6
-    canvas.create_oval(x_center - R, y_center - R, x_center + R, y_center + R, fill='white', outline='darkblue',
-                       width=2)
\ No newline at end of file
+    return (canvas.create_oval(x_center - R, y_center - R, x_center + R, y_center + R, fill='white',
+                               outline='darkblue', width=2, tags=tags),)
+
+
+class BoardRenderer:
+    """Keeps one board's canvas items alive and only touches cells that change.
+
+    Grid lines are drawn once; ships and hit/miss markers are created as
+    tagged items the first time they appear and are never torn down by a
+    redraw, so an update costs Tk a handful of item operations, not a
+    full canvas rebuild. The placement preview is one rectangle that is
+    moved with coords() rather than recreated.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.ships_drawn = 0
+        self.marks = {}  # (col, row) -> 'H' or 'M' currently shown
+        self.mark_items = {}  # (col, row) -> canvas items of that marker
+        self.ghost = None
+        self.ghost_key = None  # What the ghost currently shows, None while hidden
+        draw_grid_lines(canvas)
+
+    def sync_ships(self, board):
+        """Draws any ships added to the board since the last call."""
+        if len(board.ships) == self.ships_drawn:
+            return
+        for ship in board.ships[self.ships_drawn:]:
+            draw_ship(self.canvas, ship, tags="ship")
+        self.ships_drawn = len(board.ships)
+        self.canvas.tag_raise("marker")
+        self.canvas.tag_raise("ghost")
+
+    def show_ghost(self, board, size, col, row, orientation):
+        """Previews a ship at a cell, green if it can go there and red if not."""
+        key = (size, col, row, orientation, board.occupied)
+        if key == self.ghost_key:
+            return
+        self.ghost_key = key
+
+        x1, y1 = col * SQUARE_SIZE, row * SQUARE_SIZE
+        width = SQUARE_SIZE * size if orientation == 'H' else SQUARE_SIZE
+        height = SQUARE_SIZE if orientation == 'H' else SQUARE_SIZE * size
+        color = 'green' if board.is_valid_placement(size, col, row, orientation) else 'red'
+
+        if self.ghost is None:
+            self.ghost = self.canvas.create_rectangle(x1, y1, x1 + width, y1 + height, outline=color,
+                                                      width=3, tags="ghost")
+            return
+        self.canvas.coords(self.ghost, x1, y1, x1 + width, y1 + height)
+        self.canvas.itemconfigure(self.ghost, outline=color, state='normal')
+
+    def hide_ghost(self):
+        if self.ghost is not None and self.ghost_key is not None:
+            self.canvas.itemconfigure(self.ghost, state='hidden')
+        self.ghost_key = None
+
+    def mark_cell(self, col, row, mark):
+        """Shows a hit ('H'), a miss ('M') or nothing on one cell."""
+        key = (col, row)
+        if mark not in ('H', 'M'):
+            mark = 0
+        if self.marks.get(key, 0) == mark:
+            return
+        for item in self.mark_items.pop(key, ()):
+            self.canvas.delete(item)
+        self.marks.pop(key, None)
+
+        if mark == 'H':
+            self.mark_items[key] = draw_hit_marker(self.canvas, col, row, tags="marker")
+        elif mark == 'M':
+            self.mark_items[key] = draw_miss_marker(self.canvas, col, row, tags="marker")
+        if mark:
+            self.marks[key] = mark
+
+    def sync_marks(self, marks, kinds=('H', 'M')):
+        """Brings every cell's marker in line with a grid of 'H'/'M' values, drawing only the differences."""
+        for r, cells in enumerate(marks):
+            for c, value in enumerate(cells):
+                self.mark_cell(c, r, value if value in kinds else 0)
@@ -0,0 +1,115 @@
+import argparse
+import os
+import random
+import statistics
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from bots import STRATEGIES, place_fleet
+from common import PlayerBoard, GRID_SIZE, SHIP_SIZES
+
+# winner: 0 or 1. shots: how many shots the winner needed. first: who fired first.
+GameResult = namedtuple('GameResult', ['winner', 'shots', 'first'])
+
+
+# --- Headless Game Engine ---
+def play_game(strategy_a, strategy_b, seed=None, first=0, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES):
+    """Plays one complete bot-vs-bot game with no GUI and no delays.
+
+    Follows the PvE rules: a hit or sink earns another shot, a miss passes
+    the turn. strategy_a and strategy_b are names from bots.STRATEGIES.
+    """
+    rng = random.Random(seed)
+    boards = [PlayerBoard("A", grid_size), PlayerBoard("B", grid_size)]
+    for board in boards:
+        place_fleet(board, ship_sizes, rng)
+    bots = [STRATEGIES[name](grid_size, ship_sizes, rng) for name in (strategy_a, strategy_b)]
+
+    shots = [0, 0]
+    attacker = first
+    while True:
+        defender = 1 - attacker
+        col, row = bots[attacker].choose_shot(boards[attacker])
+        result, is_sunk = boards[defender].receive_shot(col, row)
+        boards[attacker].record_shot(col, row, result)
+        bots[attacker].record_result(col, row, result)
+        shots[attacker] += 1
+
+        if boards[defender].all_ships_sunk():
+            return GameResult(attacker, shots[attacker], first)
+        if result == 'Miss':
+            attacker = defender
+
+
+def play_games(strategy_a, strategy_b, seeds, grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES):
+    """Plays one game per seed. Even seeds let A fire first, odd seeds B."""
+    return [play_game(strategy_a, strategy_b, seed, seed % 2, grid_size, ship_sizes) for seed in seeds]
+
+
+# --- Batch Runner ---
+def run_batch(strategy_a, strategy_b, games, seed=0, workers=None, chunk_size=500,
+              grid_size=GRID_SIZE, ship_sizes=SHIP_SIZES):
+    """Plays `games` seeded games across a process pool and returns their results in seed order."""
+    seeds = range(seed, seed + games)
+    chunks = [seeds[i:i + chunk_size] for i in range(0, games, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        return play_games(strategy_a, strategy_b, seeds, grid_size, ship_sizes)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_games, strategy_a, strategy_b, chunk, grid_size, ship_sizes)
+                   for chunk in chunks]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def summarize(results, strategy_a, strategy_b, elapsed):
+    """Formats games/sec, win rates and the shots-to-win distribution."""
+    games = len(results)
+    wins = Counter(result.winner for result in results)
+    shots = sorted(result.shots for result in results)
+    first_wins = sum(1 for result in results if result.winner == result.first)
+
+    lines = [
+        f"Games: {games} in {elapsed:.2f}s ({games / elapsed:,.0f} games/sec)",
+        f"Win rate A ({strategy_a}): {wins[0] / games:.1%}",
+        f"Win rate B ({strategy_b}): {wins[1] / games:.1%}",
+        f"First shooter wins: {first_wins / games:.1%}",
+        f"Shots to win: min {shots[0]}, mean {statistics.fmean(shots):.1f}, "
+        f"median {statistics.median(shots):g}, p90 {shots[int(0.9 * (games - 1))]}, max {shots[-1]}",
+    ]
+
+    # Text histogram of shots-to-win in buckets of 5
+    buckets = Counter(s // 5 * 5 for s in shots)
+    peak = max(buckets.values())
+    for start in sorted(buckets):
+        bar = '#' * max(1, round(40 * buckets[start] / peak))
+        lines.append(f"  {start:3}-{start + 4:<3} {buckets[start]:8} {bar}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded bot-vs-bot Battleship games headlessly.")
+    parser.add_argument('-n', '--games', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0, help="Game i uses seed + i.")
+    parser.add_argument('-a', '--strategy-a', choices=sorted(STRATEGIES), default='random')
+    parser.add_argument('-b', '--strategy-b', choices=sorted(STRATEGIES), default='random')
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Processes (default: all cores).")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Games per task sent to a worker.")
+    parser.add_argument('--grid-size', type=int, default=GRID_SIZE)
+    parser.add_argument('--ships', type=int, nargs='+', default=SHIP_SIZES, help="Fleet ship sizes.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_batch(args.strategy_a, args.strategy_b, args.games, args.seed, args.workers,
+                        args.chunk_size, args.grid_size, args.ships)
+    elapsed = time.perf_counter() - start
+    print(summarize(results, args.strategy_a, args.strategy_b, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+import asyncio
+import random
+import socket
+import struct
+import time
+
+from bots import STRATEGIES, place_fleet
+from common import (
+    PlayerBoard, SHIP_SIZES, FrameDecoder, PROTOCOL_JSON, PROTOCOL_BINARY, UNSEQUENCED_MESSAGES, encode_message,
+    decode_message, pack_fleet
+)
+
+READ_SIZE = 8192
+SPECTATE_RETRY = 0.1  # Seconds a spectator waits to ask again when no game is in progress
+
+
+# --- Headless Protocol Client ---
+class HeadlessClient:
+    """Plays one networked game with a bot instead of a Tk window.
+
+    Speaks the same protocol as BattleshipGame_Client: answers GREETING
+    (switching to the binary encoding when offered), sends PLACEMENT_DONE
+    on START_PLACEMENT and fires a SHOT whenever it holds the turn. Each
+    shot's round trip, from sending it to its SHOT_RESULT, is recorded in
+    turn_latencies (seconds).
+
+    With a drop_rate, it also cuts its own connection after that share of
+    the server's reads and RESUMEs on a new one, the way a flaky network
+    would make the GUI client do.
+    """
+
+    def __init__(self, strategy='random', rng=random, binary=True, drop_rate=0.0):
+        self.rng = rng
+        self.binary = binary
+        self.drop_rate = drop_rate
+        self.board = PlayerBoard("Player")
+        self.bot = STRATEGIES[strategy](rng=rng)
+        self.protocol = PROTOCOL_JSON
+        self.writer = None
+
+        self.player_name = None
+        self.token = None
+        self.received = 0  # Sequenced messages from our seat so far, for RESUME
+        self.resuming = False
+        self.resumes = 0
+        self.attacking = False  # Past START_ATTACK, so there is a game to lose
+        self.winner = None
+        self.shot_sent = None  # perf_counter() of the SHOT awaiting its result
+        self.turn_latencies = []
+        self.server_errors = 0  # ERROR messages the server sent back
+
+    async def play(self, host, port, timeout=30):
+        """Connects, plays until GAME_OVER and returns the winner's name.
+
+        Raises ConnectionError if the server hangs up first or will not
+        resume a dropped session, and asyncio.TimeoutError if it goes
+        quiet for `timeout` seconds.
+        """
+        while not await self.play_connection(host, port, timeout):
+            self.resumes += 1
+        return self.winner
+
+    async def play_connection(self, host, port, timeout):
+        """Plays over one connection. Returns False if it was dropped on purpose to test RESUME."""
+        reader, self.writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        self.protocol = PROTOCOL_JSON
+        if self.token is not None:
+            self.resuming = True
+            self.send({"type": "RESUME", "token": self.token, "seq": self.received})
+        decoder = FrameDecoder()
+        try:
+            while self.winner is None:
+                data = await asyncio.wait_for(reader.read(READ_SIZE), timeout)
+                if not data:
+                    raise ConnectionError("Server closed the connection mid-game")
+                decoder.feed(data)
+                for payload in decoder.frames():
+                    self.handle_message(decode_message(payload))
+                await self.writer.drain()
+                if (self.drop_rate and self.token and not self.resuming and self.winner is None
+                        and self.rng.random() < self.drop_rate):
+                    # Reset rather than close, unsent data lost: what the server sees of a dead network
+                    self.writer.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                                                                     struct.pack('ii', 1, 0))
+                    self.writer.transport.abort()
+                    return False
+            return True
+        finally:
+            self.writer.close()
+
+    def send(self, message):
+        self.writer.write(encode_message(message, self.protocol))
+
+    def fire(self):
+        col, row = self.bot.choose_shot(self.board)
+        self.shot_sent = time.perf_counter()
+        self.send({"type": "SHOT", "col": col, "row": row})
+
+    def negotiate(self, message):
+        if self.binary and PROTOCOL_BINARY in message.get('protocols', []):
+            self.send({"type": "HELLO", "protocol": PROTOCOL_BINARY})
+            self.protocol = PROTOCOL_BINARY
+
+    def send_placement(self):
+        self.send({"type": "PLACEMENT_DONE", "fleet": pack_fleet(self.board.ships)})
+
+    def handle_message(self, message):
+        """Reacts to one server message the way the GUI client does."""
+        msg_type = message.get("type")
+
+        if self.resuming and msg_type not in ("STATE", "RESUMED", "RESUME_FAILED"):
+            return  # Lobby or fresh-room messages for the new connection; the server drops that room
+        if msg_type not in UNSEQUENCED_MESSAGES:
+            self.received += 1
+
+        if msg_type == "GREETING":
+            self.player_name = message['name']
+            self.token = message.get('token')
+            self.negotiate(message)
+
+        elif msg_type == "START_PLACEMENT":
+            # Seen twice if our room was dissolved by the opponent's RESUME; keep the same fleet
+            if self.board.ships_placed_count < len(SHIP_SIZES):
+                place_fleet(self.board, rng=self.rng)
+            self.send_placement()
+
+        elif msg_type == "RESUMED":
+            self.apply_resume(message)
+
+        elif msg_type == "STATE":
+            self.apply_state(message)
+
+        elif msg_type == "RESUME_FAILED":
+            if self.attacking:
+                raise ConnectionError(f"Could not resume: {message.get('message')}")
+            # Dropped before the game began, e.g. while back in the lobby: the server seats us afresh
+            self.resuming = False
+            self.token = None
+            self.received = 0
+            self.board = PlayerBoard("Player")
+
+        elif msg_type == "START_ATTACK":
+            self.attacking = True
+            if message['turn']:
+                self.fire()
+
+        elif msg_type == "YOUR_TURN":
+            self.fire()
+
+        elif msg_type == "SHOT_RESULT":
+            c, r = message['col'], message['row']
+            result = message['result']
+            if self.shot_sent is not None:
+                self.turn_latencies.append(time.perf_counter() - self.shot_sent)
+                self.shot_sent = None
+            self.board.record_shot(c, r, result)
+            self.bot.record_result(c, r, result)
+            # A hit keeps the turn, unless it sank the last ship and GAME_OVER follows
+            if result != 'Miss' and message.get('sunk_count') != len(SHIP_SIZES):
+                self.fire()
+
+        elif msg_type == "OPPONENT_SHOT":
+            c, r = message['col'], message['row']
+            self.board.grid[r][c] = 'H' if message['result'] in ('Hit', 'Sunk') else 'M'
+
+        elif msg_type == "ERROR":
+            self.server_errors += 1
+
+        elif msg_type == "GAME_OVER":
+            self.winner = message['winner']
+
+        # LOBBY, OPPONENT_TURN, OPPONENT_AWAY and OPPONENT_BACK need no reply
+
+    # --- Resume ---
+    def apply_resume(self, message):
+        """Replays the messages missed while disconnected, then takes the turn if a SHOT was lost."""
+        self.resuming = False
+        self.received = message['seq'] - len(message['messages'])  # Counted again as they are replayed
+        self.negotiate(message)
+        if message['phase'] == 'Placement' and not message['placement_done'] \
+                and self.board.ships_placed_count == len(SHIP_SIZES):
+            self.send_placement()
+        self.shot_sent = None  # Either its result is replayed below or it never arrived
+        for missed in message['messages']:
+            self.handle_message(missed)
+        if message['turn'] and self.shot_sent is None and self.winner is None:
+            self.fire()
+
+    def apply_state(self, message):
+        """Catches up from the full game state, when the server no longer has the missed messages."""
+        self.resuming = False
+        self.received = message['seq']
+        self.negotiate(message)
+        if message['phase'] == 'Placement' and not message['placement_done']:
+            if self.board.ships_placed_count == len(SHIP_SIZES):
+                self.send_placement()
+            return
+        for r, cells in enumerate(message['shots']):
+            for c, shot in enumerate(cells):
+                if shot and not self.board.shots_fired[r][c]:
+                    result = 'Hit' if shot == 'H' else 'Miss'
+                    self.board.record_shot(c, r, result)
+                    self.bot.record_result(c, r, result)
+        self.board.grid = message['grid']
+        self.shot_sent = None
+        if message['phase'] == 'Attack' and message['turn']:
+            self.fire()
+
+
+# --- Headless Spectator ---
+class HeadlessSpectator:
+    """Watches game after game over one connection, the way a tournament viewer would.
+
+    Sends SPECTATE, counts the public events of that game up to its
+    GAME_OVER, then asks for the next game in progress, until `stop` is set.
+    """
+
+    def __init__(self):
+        self.writer = None
+        self.games = 0  # Games watched to their GAME_OVER
+        self.events = 0
+        self.bytes = 0
+
+    async def watch(self, host, port, stop, timeout=30):
+        reader, self.writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        loop = asyncio.get_running_loop()
+        decoder = FrameDecoder()
+        self.request()
+        try:
+            while not stop.is_set():
+                try:
+                    data = await asyncio.wait_for(reader.read(READ_SIZE), SPECTATE_RETRY)
+                except asyncio.TimeoutError:
+                    continue  # Between games a spectator hears nothing, so silence is not an error
+                if not data:
+                    raise ConnectionError("Server closed the spectator connection")
+                self.bytes += len(data)
+                decoder.feed(data)
+                for payload in decoder.frames():
+                    msg_type = decode_message(payload).get('type')
+                    if msg_type in ('SPECTATING', 'PLAYER_READY', 'SHOT_FIRED', 'TURN', 'GAME_OVER'):
+                        self.events += 1
+                    if msg_type == 'GAME_OVER':
+                        self.games += 1
+                        self.request()
+                    elif msg_type == 'SPECTATE_FAILED':
+                        loop.call_later(SPECTATE_RETRY, self.request)
+                    # LOBBY, and GREETING or START_PLACEMENT from a pairing made before SPECTATE arrived, are ignored
+        finally:
+            self.writer.close()
+
+    def request(self):
+        if not self.writer.is_closing():
+            self.writer.write(encode_message({"type": "SPECTATE"}))
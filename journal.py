@@ -0,0 +1,246 @@
+import argparse
+import glob
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import Counter, namedtuple
+
+from common import PlayerBoard, GRID_SIZE, RESULT_CODES, RESULT_NAMES
+
+# Append-only game event journal.
+#
+# Every event is one fixed-size little-endian record, so a segment is just
+# an array of them: it can be appended to with a buffered write, cut at
+# any record boundary, and read back by memory-mapping the file and
+# unpacking in place. Segments are named <dir>/games-<run>-<index>.log,
+# where <run> is the millisecond start time of the server process (plus the
+# worker index under cluster.py), so room ids, which restart at 1 with every
+# process, stay unique as (run, room). A game restored from --state-db after
+# a restart keeps its original run: the new process appends to a new
+# segment of that run, so the whole game is still read back under one key.
+#
+#   time     float64  time.time() of the event
+#   room     uint32   GameRoom.room_id
+#   kind     uint8    EVENT_* below
+#   player   uint8    0 or 1, the player the event belongs to
+#   col, row uint8    PLACEMENT: ship origin, SHOT: target cell
+#   value    uint8    PLACEMENT: ship size, SHOT: RESULT_CODES, END: END_* reason
+#   extra    uint8    PLACEMENT: 0 = 'H' / 1 = 'V', SHOT: defender's sunk count
+RECORD = struct.Struct('<dIBBBBBBxx')
+
+EVENT_START = 1  # Room full, placement begins
+EVENT_PLACEMENT = 2  # One ship of `player`'s fleet
+EVENT_SHOT = 3  # `player` fired
+EVENT_END = 4  # `player` won
+
+END_SUNK = 0
+END_DISCONNECT = 1
+
+Event = namedtuple('Event', ['time', 'room', 'kind', 'player', 'col', 'row', 'value', 'extra'])
+
+SEGMENT_SIZE = 64 * 1024 * 1024
+WRITE_BUFFER_SIZE = 256 * 1024
+FLUSH_INTERVAL = 1.0  # Seconds an event may sit in the write buffer
+
+
+# --- Writer ---
+class Journal:
+    """Appends events to the current segment and rotates to a new one when it is full.
+
+    append() packs one record into a large write buffer, so the turn loop
+    pays for a struct pack and a memcpy; the buffer reaches the OS when it
+    fills, when the segment rotates, or from a background thread every
+    flush_interval seconds.
+    """
+
+    def __init__(self, directory, segment_size=SEGMENT_SIZE, flush_interval=FLUSH_INTERVAL, run=None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_size = segment_size - segment_size % RECORD.size  # Whole records only
+        self.flush_interval = flush_interval
+        self.run = run or int(time.time() * 1000)
+        # Continues after any segments an earlier process wrote for this run
+        self.index = 1 + max((segment_index(path) for path in segment_paths(directory)
+                              if segment_run(path) == self.run), default=-1)
+        self.file = None
+        self.resumed = {}  # Earlier run -> Journal appending to it, for restored games
+        self.written = 0
+        self._open_segment()
+        threading.Thread(target=self._flush_periodically, daemon=True).start()
+
+    def _open_segment(self):
+        if self.file is not None:
+            self.file.close()
+        path = os.path.join(self.directory, f"games-{self.run:013d}-{self.index:05d}.log")
+        self.file = open(path, 'ab', buffering=WRITE_BUFFER_SIZE)
+        self.written = 0
+        self.index += 1
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.file.flush()
+            except ValueError:
+                pass  # The segment was closed by a rotation in the meantime
+
+    def append(self, room, kind, player=0, col=0, row=0, value=0, extra=0):
+        if self.written + RECORD.size > self.segment_size:
+            self._open_segment()
+        self.file.write(RECORD.pack(time.time(), room, kind, player, col, row, value, extra))
+        self.written += RECORD.size
+
+    # Helpers for the events GameRoom records
+    def start(self, room):
+        self.append(room, EVENT_START)
+
+    def placement(self, room, player, ship):
+        self.append(room, EVENT_PLACEMENT, player, ship['col'], ship['row'], ship['size'],
+                    0 if ship['orientation'] == 'H' else 1)
+
+    def shot(self, room, player, col, row, result, sunk_count):
+        self.append(room, EVENT_SHOT, player, col, row, RESULT_CODES[result], sunk_count)
+
+    def end(self, room, winner, reason=END_SUNK):
+        self.append(room, EVENT_END, winner, value=reason)
+
+    def resume(self, run):
+        """The journal to record a game from an earlier run in, so its events stay under that run."""
+        if run == self.run:
+            return self
+        if run not in self.resumed:
+            self.resumed[run] = Journal(self.directory, self.segment_size, self.flush_interval, run)
+        return self.resumed[run]
+
+    def flush(self):
+        self.file.flush()
+        for journal in self.resumed.values():
+            journal.flush()
+
+    def close(self):
+        self.file.close()
+        for journal in self.resumed.values():
+            journal.close()
+
+
+# --- Reader ---
+def segment_paths(directory):
+    """Every segment in the directory, oldest first."""
+    return sorted(glob.glob(os.path.join(directory, "games-*-*.log")))
+
+
+def segment_run(path):
+    return int(os.path.basename(path).split('-')[1])
+
+
+def segment_index(path):
+    return int(os.path.basename(path).split('-')[2].split('.')[0])
+
+
+def read_records(path):
+    """Yields the raw record tuples of one memory-mapped segment, unpacked in place."""
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        size -= size % RECORD.size  # A record still being written is skipped
+        if not size:
+            return
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            records = RECORD.iter_unpack(mm)
+            try:
+                yield from records
+            finally:
+                del records  # Release the buffer before the map is closed
+
+
+def read_segment(path):
+    """Yields (run, Event) for every whole record of one segment."""
+    run = segment_run(path)
+    for record in read_records(path):
+        yield run, Event._make(record)
+
+
+def read_events(directory):
+    """Yields (run, Event) across all segments in the order they were written."""
+    for path in segment_paths(directory):
+        yield from read_segment(path)
+
+
+def scan(directory):
+    """Counts events and games without building any boards; fast enough for millions of games."""
+    kinds = Counter()
+    results = Counter()
+    ends = Counter()
+    for path in segment_paths(directory):
+        for _, _, kind, _, _, _, value, _ in read_records(path):
+            kinds[kind] += 1
+            if kind == EVENT_SHOT:
+                results[value] += 1
+            elif kind == EVENT_END:
+                ends[value] += 1
+    return kinds, {RESULT_NAMES[code]: count for code, count in results.items()}, ends
+
+
+def game_events(directory, run, room):
+    """Every event of one game, in order. Only that server run's segments are read."""
+    return [Event._make(record) for path in segment_paths(directory) if segment_run(path) == run
+            for record in read_records(path) if record[1] == room]
+
+
+def replay(events, grid_size=GRID_SIZE):
+    """Rebuilds both boards from a game's events and re-applies every shot.
+
+    Returns (boards, mismatches): the final PlayerBoards and a list of the
+    shots whose recorded result differs from what the rules give.
+    """
+    boards = [PlayerBoard("Player 1", grid_size), PlayerBoard("Player 2", grid_size)]
+    mismatches = []
+    for event in events:
+        if event.kind == EVENT_PLACEMENT:
+            boards[event.player].add_ship(event.value, event.col, event.row, 'V' if event.extra else 'H')
+        elif event.kind == EVENT_SHOT:
+            defender = boards[1 - event.player]
+            result, is_sunk = defender.receive_shot(event.col, event.row)
+            boards[event.player].record_shot(event.col, event.row, result)
+            if RESULT_CODES[result] != event.value:
+                mismatches.append((event, result))
+    return boards, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize or replay a server game journal.")
+    parser.add_argument('directory')
+    parser.add_argument('--replay', metavar='RUN:ROOM', help="Replay one game and check every recorded result.")
+    args = parser.parse_args()
+
+    if args.replay:
+        run, room = (int(part) for part in args.replay.split(':'))
+        events = game_events(args.directory, run, room)
+        if not events:
+            raise SystemExit(f"No events for game {args.replay}")
+        for event in events:
+            if event.kind == EVENT_SHOT:
+                print(f"Player {event.player + 1} fired at {chr(ord('A') + event.col)}{event.row + 1}: "
+                      f"{RESULT_NAMES[event.value]}")
+            elif event.kind == EVENT_END:
+                reason = "disconnect" if event.value == END_DISCONNECT else "all ships sunk"
+                print(f"Player {event.player + 1} wins ({reason})")
+        boards, mismatches = replay(events)
+        print(f"Replay: {len(mismatches)} recorded results differ from the rules")
+        for event, result in mismatches:
+            print(f"  ({event.col},{event.row}) recorded {RESULT_NAMES[event.value]}, rules give {result}")
+        return
+
+    start = time.perf_counter()
+    kinds, results, ends = scan(args.directory)
+    elapsed = time.perf_counter() - start
+    total = sum(kinds.values())
+    print(f"Events: {total:,} in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} events/sec)")
+    print(f"Games started: {kinds[EVENT_START]:,} | finished: {ends[END_SUNK]:,} | "
+          f"forfeited: {ends[END_DISCONNECT]:,}")
+    print(f"Shots: {kinds[EVENT_SHOT]:,} ({', '.join(f'{name} {results.get(name, 0):,}' for name in RESULT_NAMES)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from bots import STRATEGIES
+from headless_client import HeadlessClient, HeadlessSpectator
+from server import PORT
+
+LOOPBACK = '127.0.0.1'
+
+
+# --- Load Generator ---
+class LoadStats:
+    """Everything the load generator measures, shared by all of its clients."""
+
+    def __init__(self):
+        self.games = 0  # Games a client reported winning, i.e. finished games
+        self.sessions = 0  # Client connections that reached GAME_OVER
+        self.shots = 0
+        self.resumes = 0  # Dropped connections that picked their game back up
+        self.watched = 0  # Games spectators followed to GAME_OVER
+        self.spectator_events = 0
+        self.latencies = []  # Seconds from SHOT to SHOT_RESULT
+        self.errors = Counter()  # kind -> count
+
+    def record(self, client):
+        self.sessions += 1
+        self.games += client.winner == client.player_name
+        self.shots += len(client.turn_latencies)
+        self.resumes += client.resumes
+        self.latencies.extend(client.turn_latencies)
+        if client.server_errors:
+            self.errors['server_error'] += client.server_errors
+
+
+async def run_client(index, args, stats):
+    """One simulated player: connects, plays a game, and repeats for args.rounds games."""
+    if args.ramp:
+        await asyncio.sleep(args.ramp * index / args.clients)
+    for round_number in range(args.rounds):
+        rng = random.Random(args.seed + index * args.rounds + round_number)
+        client = HeadlessClient(args.strategy, rng, binary=not args.json, drop_rate=args.drop_rate)
+        try:
+            await client.play(args.host, args.port, args.timeout)
+            stats.record(client)
+        except asyncio.TimeoutError:
+            stats.errors['timeout'] += 1
+        except OSError:
+            # Includes ConnectionError, raised when the server hangs up mid-game
+            stats.errors['connect' if client.writer is None else 'disconnect'] += 1
+        except Exception:
+            stats.errors['protocol'] += 1
+
+
+async def run_spectator(args, stats, stop):
+    """One viewer watching whichever games are in progress until the players are done."""
+    spectator = HeadlessSpectator()
+    try:
+        await spectator.watch(args.host, args.port, stop, args.timeout)
+    except (OSError, asyncio.TimeoutError):
+        stats.errors['spectator'] += 1
+    stats.watched += spectator.games
+    stats.spectator_events += spectator.events
+
+
+async def run_load(args):
+    stats = LoadStats()
+    stop = asyncio.Event()
+    spectators = [asyncio.create_task(run_spectator(args, stats, stop)) for _ in range(args.spectators)]
+    await asyncio.gather(*(run_client(i, args, stats) for i in range(args.clients)))
+    stop.set()
+    await asyncio.gather(*spectators)
+    return stats
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return values[int(fraction * (len(values) - 1))]
+
+
+def summarize(stats, args, elapsed):
+    """Formats throughput, turn-latency percentiles and error counts."""
+    lines = [
+        f"Clients: {args.clients} x {args.rounds} game(s) against {args.host}:{args.port}",
+        f"Games finished: {stats.games} in {elapsed:.2f}s ({stats.games / elapsed:,.1f} games/sec, "
+        f"{stats.shots / elapsed:,.0f} shots/sec)",
+    ]
+    latencies = sorted(stats.latencies)
+    if latencies:
+        ms = [1000 * latency for latency in latencies]
+        lines.append(f"Turn latency (ms): p50 {percentile(ms, 0.5):.2f}, p90 {percentile(ms, 0.9):.2f}, "
+                     f"p99 {percentile(ms, 0.99):.2f}, max {ms[-1]:.2f}")
+    if args.drop_rate:
+        lines.append(f"Resumed connections: {stats.resumes}")
+    if args.spectators:
+        lines.append(f"Spectators: {args.spectators} watched {stats.watched} game(s), "
+                     f"{stats.spectator_events:,} events")
+    errors = ", ".join(f"{kind} {count}" for kind, count in sorted(stats.errors.items()))
+    lines.append(f"Errors: {errors or 'none'}")
+    return "\n".join(lines)
+
+
+# --- Loopback Server ---
+def spawn_server(mode, port, workers=None, wait=10):
+    """Starts server.py (or cluster.py) on the loopback interface and returns once it accepts connections."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    if mode == 'cluster':
+        command = [os.path.join(here, 'cluster.py')] + (['--workers', str(workers)] if workers else [])
+    else:
+        command = [os.path.join(here, 'server.py'), '--mode', mode]
+    process = subprocess.Popen([sys.executable] + command + ['--host', LOOPBACK, '--port', str(port),
+                                                             '--report-interval', '0'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((LOOPBACK, port), timeout=1).close()
+            # That probe sits in the lobby until it is noticed as closed; let it go first
+            time.sleep(0.2)
+            return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise SystemExit(f"Server did not start on {LOOPBACK}:{port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test server.py with headless bot clients.")
+    parser.add_argument('-c', '--clients', type=int, default=100, help="Concurrent connections (even).")
+    parser.add_argument('-r', '--rounds', type=int, default=1, help="Games each client plays in turn.")
+    parser.add_argument('--host', default=LOOPBACK)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--spawn', choices=['threaded', 'async', 'cluster'],
+                        help="Start server.py in this mode, or cluster.py, on the loopback port for the run.")
+    parser.add_argument('--workers', type=int, help="Worker processes for --spawn cluster (default: cores).")
+    parser.add_argument('--strategy', choices=sorted(STRATEGIES), default='random')
+    parser.add_argument('--json', action='store_true', help="Stay on JSON instead of negotiating binary.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--ramp', type=float, default=0, help="Seconds over which to spread connection starts.")
+    parser.add_argument('--drop-rate', type=float, default=0,
+                        help="Chance per server read that a client cuts its connection and RESUMEs.")
+    parser.add_argument('--spectators', type=int, default=0,
+                        help="Extra connections that SPECTATE the games in progress while the load runs.")
+    parser.add_argument('--timeout', type=float, default=30, help="Seconds of server silence counted as an error.")
+    parser.add_argument('--max-errors', type=int, default=0, help="Exit 1 if more errors than this.")
+    parser.add_argument('--max-p99', type=float, default=None, help="Exit 1 if p99 turn latency exceeds this (ms).")
+    args = parser.parse_args()
+    if args.clients < 2 or args.clients % 2:
+        parser.error("--clients must be an even number, two per game")
+
+    server = None
+    if args.spawn:
+        args.host = LOOPBACK
+        server = spawn_server(args.spawn, args.port, args.workers)
+    try:
+        start = time.perf_counter()
+        stats = asyncio.run(run_load(args))
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(summarize(stats, args, elapsed))
+
+    failures = []
+    if sum(stats.errors.values()) > args.max_errors:
+        failures.append(f"{sum(stats.errors.values())} errors (allowed {args.max_errors})")
+    if args.max_p99 is not None and stats.latencies:
+        p99 = 1000 * percentile(sorted(stats.latencies), 0.99)
+        if p99 > args.max_p99:
+            failures.append(f"p99 turn latency {p99:.2f}ms (allowed {args.max_p99}ms)")
+    if failures:
+        raise SystemExit("FAILED: " + "; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import threading
+from bisect import bisect_left
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Server instrumentation in the Prometheus text format.
+#
+# Recording is plain attribute and Counter updates on the handler path: no
+# locks, no formatting, no allocation beyond a new label the first time it
+# is seen. Everything is turned into text only when /metrics is scraped,
+# from a separate thread; under the GIL a scrape may be a message or two
+# behind, which is fine for monitoring.
+
+# Seconds; spans a fast in-memory shot up to one stuck behind a slow socket
+SHOT_LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Message types counted under their own label; anything else a client sends is "other"
+MESSAGE_TYPES = {'HELLO', 'PLACEMENT_DONE', 'SHOT', 'GREETING', 'LOBBY', 'START_PLACEMENT', 'START_ATTACK',
+                 'YOUR_TURN', 'OPPONENT_TURN', 'SHOT_RESULT', 'OPPONENT_SHOT', 'GAME_OVER', 'ERROR',
+                 'REATTACH', 'RESUME', 'STATE', 'RESUMED', 'RESUME_FAILED', 'OPPONENT_AWAY', 'OPPONENT_BACK',
+                 'SPECTATE', 'SPECTATING', 'SPECTATE_FAILED', 'PLAYER_READY', 'SHOT_FIRED', 'TURN'}
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is one bisect and three additions."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name):
+        lines, cumulative = [], 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else f'{bound:g}'
+            lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+        lines.append(f'{name}_sum {self.total:.6f}')
+        lines.append(f'{name}_count {self.count}')
+        return lines
+
+
+class ServerMetrics:
+    """Counters, a shot-latency histogram and scrape-time gauges for one server process."""
+
+    def __init__(self):
+        self.messages_in = Counter()  # type -> messages received
+        self.messages_out = Counter()  # type -> messages sent
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.send_errors = 0
+        self.connections_opened = 0
+        self.connections_closed = 0
+        self.games_finished = 0
+        self.spectators_dropped = 0
+        self.slow_consumers = 0
+        self.shot_latency = Histogram(SHOT_LATENCY_BUCKETS)
+        self.gauges = []  # (name, help, function returning the current value)
+
+    def gauge(self, name, help_text, function):
+        """Registers a value that is read only when metrics are scraped."""
+        self.gauges.append((name, help_text, function))
+
+    def record_receive(self, message):
+        msg_type = message.get('type')
+        self.messages_in[msg_type if msg_type in MESSAGE_TYPES else 'other'] += 1
+
+    def record_send(self, message, sent):
+        """Counts one outgoing message; `sent` is its size in bytes, or 0 if sending failed."""
+        if sent:
+            self.messages_out[message.get('type')] += 1
+            self.bytes_out += sent
+        else:
+            self.send_errors += 1
+
+    def render(self):
+        """Returns every metric in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            lines.extend(samples)
+
+        metric('battleship_messages_received_total', 'counter', 'Messages received from clients, by type.',
+               [f'battleship_messages_received_total{{type="{t}"}} {n}' for t, n in sorted(self.messages_in.items())])
+        metric('battleship_messages_sent_total', 'counter', 'Messages sent to clients, by type.',
+               [f'battleship_messages_sent_total{{type="{t}"}} {n}' for t, n in sorted(self.messages_out.items())])
+        metric('battleship_bytes_received_total', 'counter', 'Bytes read from client sockets.',
+               [f'battleship_bytes_received_total {self.bytes_in}'])
+        metric('battleship_bytes_sent_total', 'counter', 'Bytes written to client sockets.',
+               [f'battleship_bytes_sent_total {self.bytes_out}'])
+        metric('battleship_send_errors_total', 'counter', 'Messages that could not be sent.',
+               [f'battleship_send_errors_total {self.send_errors}'])
+        metric('battleship_connections_opened_total', 'counter', 'Client connections accepted.',
+               [f'battleship_connections_opened_total {self.connections_opened}'])
+        metric('battleship_connections_active', 'gauge', 'Client connections currently open.',
+               [f'battleship_connections_active {self.connections_opened - self.connections_closed}'])
+        metric('battleship_games_finished_total', 'counter', 'Games played to the last ship.',
+               [f'battleship_games_finished_total {self.games_finished}'])
+        metric('battleship_spectators_dropped_total', 'counter', 'Spectators disconnected for falling behind.',
+               [f'battleship_spectators_dropped_total {self.spectators_dropped}'])
+        metric('battleship_slow_consumers_total', 'counter', 'Players disconnected for not taking what they were sent.',
+               [f'battleship_slow_consumers_total {self.slow_consumers}'])
+        metric('battleship_shot_handling_seconds', 'histogram',
+               'Time to apply a SHOT and queue its results; they are written when the frame batch closes.',
+               self.shot_latency.render('battleship_shot_handling_seconds'))
+        for name, help_text, function in self.gauges:
+            metric(name, 'gauge', help_text, [f'{name} {function()}'])
+        return '\n'.join(lines) + '\n'
+
+
+# --- HTTP Endpoint ---
+def serve_metrics(metrics, host, port):
+    """Serves GET /metrics from a daemon thread and returns the HTTP server."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes every few seconds would drown out the game log
+
+    httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
@@ -0,0 +1,55 @@
+import json
+import sqlite3
+import time
+
+# Room snapshots in a local SQLite database, for warm restarts.
+#
+# The server marks a room dirty when a message changes it and, every
+# checkpoint interval, copies the dirty rooms' snapshots (GameRoom.snapshot)
+# and hands them to save() off the turn loop: one transaction per batch,
+# one row per room, replaced in place. Finished rooms are deleted, so the
+# table only ever holds games worth resuming.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    room_id INTEGER PRIMARY KEY,
+    game_state TEXT NOT NULL,
+    saved REAL NOT NULL,
+    snapshot TEXT NOT NULL
+)
+"""
+
+ACTIVE_STATES = ("Placement", "Attack")
+
+
+class RoomStore:
+    """Saves and loads GameRoom snapshots."""
+
+    def __init__(self, path):
+        # save() runs on a worker thread (asyncio.to_thread or the checkpoint thread), one call at a time
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(SCHEMA)
+        self.db.commit()
+
+    def save(self, snapshots, removed=()):
+        """Writes a batch of snapshots and deletes rooms that no longer exist, in one transaction."""
+        now = time.time()
+        upserts, deletes = [], [(room_id,) for room_id in removed]
+        for snapshot in snapshots:
+            if snapshot['game_state'] in ACTIVE_STATES:
+                upserts.append((snapshot['room_id'], snapshot['game_state'], now, json.dumps(snapshot)))
+            else:
+                deletes.append((snapshot['room_id'],))
+        with self.db:
+            self.db.executemany("INSERT OR REPLACE INTO rooms VALUES (?, ?, ?, ?)", upserts)
+            self.db.executemany("DELETE FROM rooms WHERE room_id = ?", deletes)
+
+    def load(self):
+        """Every saved room that was still in play, oldest room first."""
+        rows = self.db.execute("SELECT snapshot FROM rooms ORDER BY room_id")
+        return [json.loads(snapshot) for (snapshot,) in rows]
+
+    def close(self):
+        self.db.close()
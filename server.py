@@ -1,169 +1,1244 @@
+import argparse
+import asyncio
+import itertools
+import secrets
 import socket
 import threading
-import json
 import time
-from common import PlayerBoard, SHIP_SIZES  # Import from our common file
+from collections import OrderedDict, deque
+from common import (  # Import from our common file
+    PlayerBoard, FrameDecoder, PROTOCOL_JSON, SUPPORTED_PROTOCOLS, encode_message, decode_message, message_fleet,
+    on_board, validate_fleet
+)
+from journal import Journal, END_DISCONNECT
+from metrics import ServerMetrics, serve_metrics
+from persistence import RoomStore
 
 HOST = '0.0.0.0'  # Listen on all network interfaces
 PORT = 65432
 MAX_PLAYERS = 2
+BACKLOG = 1024  # Pending connections the async server will queue
+READ_BUFFER_SIZE = 8192  # Per-connection receive buffer
+METRICS_HOST = '127.0.0.1'  # The metrics endpoint is for a local Prometheus agent only
+CHECKPOINT_INTERVAL = 1.0  # Seconds between room snapshots when --state-db is set
+REATTACH_GRACE = 120  # Seconds a restored seat waits for its player before forfeiting
+RESUME_GRACE = 60  # Seconds a dropped player's seat is held for RESUME
+RESUME_HISTORY = 1024  # Messages kept per seat for RESUME; a full game sends a few hundred
+SEND_HIGH_WATER = 64 * 1024  # Queued outbound bytes at which a client's reads pause (and a spectator is dropped)
+SEND_LOW_WATER = 16 * 1024  # Queued outbound bytes at which paused reads resume
+SEND_LIMIT = 256 * 1024  # Queued outbound bytes at which a player is disconnected as a slow consumer
+SLOW_CONSUMER_TIMEOUT = 10  # Seconds a send queue may stay over the high watermark before disconnecting
+NONBLOCKING_SEND = hasattr(socket, 'MSG_DONTWAIT')  # Not on Windows, where every write goes through the queue
 
-clients = []  # List to hold client socket objects
-player_boards = {}  # Dictionary to map client_socket -> PlayerBoard
-player_names = {}
-client_placement_done = {}
-game_state = "Waiting"  # Waiting, Placement, Attack
-turn_index = 0
 
+# --- Connections ---
+class SendLimits:
+    """Bounds on each connection's outbound queue, shared by every connection of a server.
 
-def send_to_all(message):
-    """Sends a message to all connected clients."""
-    for client in clients:
-        send_to_client(client, message)
+    Over `high` queued bytes a connection's reads pause until the queue
+    drains to `low`, so a client that does not read what it is sent cannot
+    get the server to do more work for it, and a spectator is dropped
+    outright. A player queued past `limit`, or over `high` for `timeout`
+    seconds, is disconnected as a slow consumer; like any lost connection,
+    its seat is held for RESUME.
+    """
 
+    def __init__(self, high=SEND_HIGH_WATER, low=SEND_LOW_WATER, limit=SEND_LIMIT, timeout=SLOW_CONSUMER_TIMEOUT):
+        self.high = high
+        self.low = low
+        self.limit = limit
+        self.timeout = timeout
 
-def send_to_client(client, message):
-    """Sends a message to a single client."""
-    try:
-        data = json.dumps(message).encode('utf-8')
-        # Prepend with 8-byte length header
-        header = f"{len(data):<8}".encode('utf-8')
-        client.sendall(header + data)
-    except Exception as e:
-        print(f"[SERVER] Error sending message: {e}")
 
+class WriteBatch:
+    """Holds back what connections send while a batch is open, then writes it out.
+
+    A state transition (one SHOT, a pairing, a resume) sends several messages,
+    often two to the same player. Inside `with batch:` each connection only
+    queues its messages; when the outermost block closes, each connection
+    writes all of its frames with a single sendall or transport write.
+    The threaded server opens batches under its lock, so one batch is shared
+    by every connection of a server.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.pending = []  # Connections with queued messages, in the order they were first sent to
 
-def handle_client(client_socket, player_name):
-    """Handles messages from a single client in a thread."""
-    global game_state, turn_index
+    def __enter__(self):
+        self.depth += 1
+        return self
 
-    player_boards[client_socket] = PlayerBoard(player_name)
-    player_names[client_socket] = player_name
-    client_placement_done[client_socket] = False
+    def __exit__(self, *exc_info):
+        self.depth -= 1
+        if self.depth == 0:
+            pending, self.pending = self.pending, []
+            for connection in pending:
+                connection.flush()
 
-    # Tell the client their name
-    send_to_client(client_socket, {"type": "GREETING", "name": player_name})
 
-    if len(clients) == MAX_PLAYERS:
-        game_state = "Placement"
-        print("[SERVER] Both players connected. Starting placement phase.")
-        send_to_all({"type": "START_PLACEMENT", "message": "Both players connected. Place your ships!"})
+class Connection:
+    """Common send path of the threaded and asyncio connections.
 
-    while True:
+    Subclasses provide write(data), which must not block, backlog() (bytes
+    written but not yet taken by the socket) and shutdown().
+    """
+
+    def __init__(self, metrics, batch, limits):
+        self.metrics = metrics
+        self.batch = batch
+        self.limits = limits
+        self.over_high_since = None  # When backlog() was last seen going over limits.high
+        self.broken = False  # A write failed without raising; check_backlog drops the connection
+        self.decoder = FrameDecoder(READ_BUFFER_SIZE)
+        self.room = None  # Set once the lobby pairs this client
+        self.protocol = PROTOCOL_JSON  # Until the client's HELLO picks another
+        self.lost = False  # Failed rather than closed by the client; its seat is held for RESUME
+        self.queued = []  # Messages held back by an open WriteBatch
+        self.watching = None  # The GameRoom this connection spectates, if any
+
+    def send(self, message):
+        if self.batch.depth:
+            if not self.queued:
+                self.batch.pending.append(self)
+            self.queued.append(message)
+        else:
+            self.write_messages([message])
+
+    def flush(self):
+        messages, self.queued = self.queued, []
+        self.write_messages(messages)
+
+    def write_messages(self, messages):
+        """Encodes messages back to back and writes them at once; the client's FrameDecoder splits them."""
         try:
-            # Read header
-            header = client_socket.recv(8)
-            if not header:
+            frames = [encode_message(message, self.protocol) for message in messages]
+            self.write(frames[0] if len(frames) == 1 else b''.join(frames))
+        except Exception as e:
+            print(f"[SERVER] Error sending message: {e}")
+            # Nothing of the batch went out, so the client is out of step: drop it and hold its seat for RESUME.
+            # A failed send can also consume the reset, leaving the reading side a plain EOF.
+            self.broken = True
+            for message in messages:
+                self.metrics.record_send(message, 0)
+            self.check_backlog()
+            return
+        for message, data in zip(messages, frames):
+            self.metrics.record_send(message, len(data))
+        self.check_backlog()
+
+    def push(self, message, data):
+        """Sends a spectator event already encoded as `data`, the same bytes for every spectator.
+
+        Returns False, without sending, when this connection is already
+        over the high watermark or is gone; the room then drops it, and the
+        players it is sending for never see the error.
+        """
+        if self.backlog() + len(data) > self.limits.high:
+            return False
+        try:
+            self.write(data)
+        except OSError:
+            return False
+        if self.broken:
+            return False
+        self.metrics.record_send(message, len(data))
+        return True
+
+    def check_backlog(self):
+        """Disconnects this connection if a write failed or it is a slow consumer (see SendLimits).
+
+        Returns False if it did.
+        """
+        if self.broken:
+            self.lost = True
+            self.shutdown()
+            return False
+        backlog = self.backlog()
+        if backlog <= self.limits.high:
+            self.over_high_since = None
+            return True
+        now = time.monotonic()
+        if self.over_high_since is None:
+            self.over_high_since = now
+        if backlog <= self.limits.limit and now - self.over_high_since < self.limits.timeout:
+            return True
+        print(f"[SERVER] Disconnecting a slow consumer with {backlog} bytes unsent")
+        self.metrics.slow_consumers += 1
+        self.lost = True
+        self.shutdown()
+        return False
+
+
+class SocketConnection(Connection):
+    """A client served by the threaded server (blocking socket).
+
+    Writes come from whichever player thread holds the server lock, so they
+    must never wait for this client: a frame goes straight out with a
+    non-blocking send when the socket can take all of it, and whatever is
+    left is queued for a writer thread of this connection's own, started
+    the first time that happens. Meanwhile this client's reader thread
+    waits in wait_writable() while the queue is over the high watermark.
+    """
+
+    def __init__(self, sock, metrics, batch, limits):
+        super().__init__(metrics, batch, limits)
+        self.sock = sock
+        self.queue = deque()  # Frames for the writer thread
+        self.queued_bytes = 0
+        self.sending = False  # The writer thread is in sendall, outside the condition's lock
+        self.writer = None
+        self.changed = threading.Condition()  # Guards the queue; notified whenever queued_bytes or a flag changes
+        self.closed = False
+
+    def write(self, data):
+        with self.changed:
+            if self.broken:
+                return  # Being dropped; see check_backlog
+            if NONBLOCKING_SEND and not self.queue and not self.sending:
+                try:
+                    data = data[self.sock.send(data, socket.MSG_DONTWAIT):]
+                except BlockingIOError:
+                    pass  # The socket buffer is full
+                except OSError:
+                    # Reset or closed under us: fail like the writer thread, never into the sending thread
+                    self.broken = True
+                    self.changed.notify_all()
+                    return
+                if not data:
+                    return
+            self.queue.append(data)
+            self.queued_bytes += len(data)
+            if self.writer is None:
+                self.writer = threading.Thread(target=self.write_queue, daemon=True)
+                self.writer.start()
+            self.changed.notify_all()
+
+    def backlog(self):
+        return self.queued_bytes
+
+    def write_queue(self):
+        while True:
+            with self.changed:
+                while not self.queue and not self.closed:
+                    self.changed.wait()
+                if not self.queue:
+                    break
+                data = b''.join(self.queue)
+                self.queue.clear()
+                self.sending = True
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                with self.changed:
+                    self.broken = True  # The next check_backlog drops this client
+                    self.sending = False
+                    self.changed.notify_all()
                 break
-            msg_len = int(header.decode('utf-8').strip())
+            with self.changed:
+                self.queued_bytes -= len(data)
+                self.sending = False
+                self.changed.notify_all()
+        if self.closed:
+            self.sock.close()
+
+    def wait_writable(self):
+        """Holds back this client's reader while its queue is over the high watermark, until it drains to the low one.
+
+        Returns False once the connection is broken, as nothing more can be sent to it.
+        """
+        with self.changed:
+            if self.queued_bytes > self.limits.high:
+                self.changed.wait_for(lambda: self.queued_bytes <= self.limits.low or self.broken)
+            return not self.broken
+
+    def shutdown(self):
+        """Ends the connection from another thread; its own thread sees EOF and closes the socket."""
+        with self.changed:
+            self.broken = True
+            self.changed.notify_all()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already gone
+
+    def close(self):
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+            if (self.queue or self.sending) and not self.broken:
+                # The writer thread closes the socket once the rest is sent, unless the client stalls
+                threading.Timer(self.limits.timeout, self.shutdown).start()
+                return
+        self.sock.close()
+
+
+class StreamConnection(Connection):
+    """A client served by the asyncio server (stream reader/writer pair).
+
+    The transport's buffer is the send queue: with its limits set to the
+    watermarks, writer.drain() waits from the high watermark down to the
+    low one, and serve_connection drains before every read.
+    """
+
+    def __init__(self, reader, writer, metrics, batch, limits):
+        super().__init__(metrics, batch, limits)
+        self.reader = reader
+        self.writer = writer
+        writer.transport.set_write_buffer_limits(high=limits.high, low=limits.low)
+
+    def write(self, data):
+        if self.writer.is_closing():
+            raise ConnectionResetError("Connection closed")  # asyncio would drop the data, only logging it
+        self.writer.write(data)
+
+    def backlog(self):
+        return self.writer.transport.get_write_buffer_size()
+
+    def shutdown(self):
+        self.writer.transport.abort()  # close() would wait for a stalled client to take its backlog
+
+    def close(self):
+        if self.backlog():
+            # close() sends the rest first; a client that stalls would keep the transport forever
+            asyncio.get_running_loop().call_later(self.limits.timeout, self.writer.transport.abort)
+        self.writer.close()
+
+
+class DetachedSeat:
+    """Holds a seat while its player is away (dropped, or not back since a restart).
+
+    Messages to it are dropped on the floor; the room's per-seat history
+    still has them for RESUME.
+    """
+
+    def __init__(self, room):
+        self.room = room
+        self.protocol = PROTOCOL_JSON
+        self.lost = False
+        self.watching = None
+
+    def send(self, message):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+# --- Game Room ---
+class GameRoom:
+    """Holds the state of a single two-player match.
+
+    Players are connection objects with a send(message) method, so the same
+    room logic runs under the threaded server and the asyncio server.
+    Placements, shots and the result go to the journal when one is given.
+    Spectators get a public event stream that never shows unsunk ships.
+    """
+
+    def __init__(self, room_id, verbose=True, journal=None):
+        self.room_id = room_id
+        self.verbose = verbose
+        self.journal = journal
+        self.clients = []  # Connections, in join order
+        self.player_boards = {}  # connection -> PlayerBoard
+        self.player_names = {}
+        self.client_placement_done = {}
+        self.tokens = {}  # connection -> session token, for REATTACH and RESUME
+        self.sent = {}  # connection -> the last RESUME_HISTORY messages sent to that seat
+        self.sent_count = {}  # connection -> messages ever sent to that seat; the last one's sequence number
+        self.spectators = set()
+        self.game_state = "Waiting"  # Waiting, Placement, Attack, Over
+        self.turn_index = 0
+
+    def log(self, text):
+        if self.verbose:
+            print(f"[ROOM {self.room_id}] {text}")
+
+    def is_full(self):
+        return len(self.clients) == MAX_PLAYERS
+
+    def send(self, client, message):
+        """Sends a message to one seat, keeping it so a resumed connection can catch up."""
+        self.sent[client].append(message)
+        self.sent_count[client] += 1
+        client.send(message)
+
+    def send_to_all(self, message):
+        """Sends a message to every player in the room."""
+        for client in self.clients:
+            self.send(client, message)
+
+    def broadcast(self, event):
+        """Sends a public event to every spectator, encoded once for all of them.
+
+        A spectator too far behind to take it, or whose connection failed, is
+        dropped rather than waited for. Called once a transition is complete,
+        so nothing here can interrupt a player's move.
+        """
+        if not self.spectators:
+            return
+        data = encode_message(event)
+        for spectator in list(self.spectators):
+            if not spectator.push(event, data):
+                self.drop_spectator(spectator)
+
+    def add_spectator(self, connection):
+        connection.watching = self
+        self.spectators.add(connection)
+        state = self.spectator_state()
+        if not connection.push(state, encode_message(state)):
+            self.drop_spectator(connection)
+
+    def drop_spectator(self, connection):
+        self.log("Dropped a spectator that fell behind or went away.")
+        connection.metrics.spectators_dropped += 1
+        self.remove_spectator(connection)
+        connection.shutdown()
+
+    def remove_spectator(self, connection):
+        connection.watching = None
+        self.spectators.discard(connection)
+
+    def add_player(self, client, token=None, sent_count=0):
+        """Seats a new player and starts placement once the room is full.
+
+        A player moved here from a dissolved room keeps its token and message
+        numbering, so a RESUME based on the old room still lines up.
+        """
+        player_name = f"Player {len(self.clients) + 1}"
+        self.clients.append(client)
+        self.player_boards[client] = PlayerBoard(player_name)
+        self.player_names[client] = player_name
+        self.client_placement_done[client] = False
+        self.tokens[client] = token or secrets.token_hex(16)
+        self.sent[client] = deque(maxlen=RESUME_HISTORY)
+        self.sent_count[client] = sent_count
+
+        # Tell the client their name, and the token that lets them resume this seat
+        self.send(client, {"type": "GREETING", "name": player_name, "protocols": SUPPORTED_PROTOCOLS,
+                           "token": self.tokens[client]})
+
+        if self.is_full():
+            self.game_state = "Placement"
+            if self.journal:
+                self.journal.start(self.room_id)
+            self.log("Both players connected. Starting placement phase.")
+            self.send_to_all({"type": "START_PLACEMENT", "message": "Both players connected. Place your ships!"})
+        return player_name
+
+    def remove_player(self, client):
+        """Drops a player; a game in progress is awarded to the opponent."""
+        if client not in self.player_names:
+            return
+        player_name = self.player_names[client]
+        self.log(f"{player_name} disconnected.")
+        player_index = self.clients.index(client)
+        self.clients.remove(client)
+        del self.player_boards[client]
+        del self.player_names[client]
+        del self.client_placement_done[client]
+        del self.tokens[client]
+        del self.sent[client]
+        del self.sent_count[client]
+
+        if self.game_state in ("Placement", "Attack") and self.clients:
+            winner = self.clients[0]
+            self.game_state = "Over"
+            if self.journal:
+                self.journal.end(self.room_id, 1 - player_index, END_DISCONNECT)
+            game_over = {"type": "GAME_OVER", "winner": self.player_names[winner],
+                         "message": f"{player_name} disconnected."}
+            self.send(winner, game_over)
+            self.broadcast(game_over)
+
+    def handle_message(self, client, message):
+        """Applies one message from a player. Returns False once the game is over."""
+        player_name = self.player_names[client]
+        msg_type = message.get('type')
+
+        if msg_type == 'PLACEMENT_DONE':
+            if self.client_placement_done[client]:
+                # Sent again after a reconnect, or left over from a room dissolved by a RESUME
+                return True
+            # Client sent their fleet; the board is built here from the checked placements
+            placements = validate_fleet(message_fleet(message))
+            if placements is None:
+                self.log(f"{player_name} sent an invalid fleet.")
+                self.send(client, {"type": "ERROR", "message": "Invalid fleet placement."})
+                return True
+            board = self.player_boards[client]
+            for placement in placements:
+                board.add_ship(len(placement.cells), placement.col, placement.row, placement.orientation)
+            self.client_placement_done[client] = True
+            if self.journal:
+                player_index = self.clients.index(client)
+                for ship in board.ships:
+                    self.journal.placement(self.room_id, player_index, ship)
+            self.log(f"{player_name} has finished placement.")
+
+            # Check if all players are done
+            if self.is_full() and all(self.client_placement_done.values()):
+                self.game_state = "Attack"
+                self.turn_index = 0  # Player 1 (first to connect) goes first
+                attacker = self.clients[self.turn_index]
+                defender = self.clients[1 - self.turn_index]
+
+                self.log("All players ready. Starting attack phase.")
+                self.send(attacker, {"type": "START_ATTACK", "turn": True, "message": "Your turn! Fire a shot."})
+                self.send(defender, {"type": "START_ATTACK", "turn": False, "message": "Opponent's turn."})
+                self.broadcast({"type": "PLAYER_READY", "player": player_name})
+                self.broadcast({"type": "TURN", "player": self.player_names[attacker]})
+            else:
+                self.broadcast({"type": "PLAYER_READY", "player": player_name})
+
+        elif msg_type == 'SHOT':
+            if self.game_state != "Attack" or client != self.clients[self.turn_index]:
+                self.send(client, {"type": "ERROR", "message": "Not your turn or game not in Attack phase."})
+                return True
+
+            col, row = message.get('col'), message.get('row')
+            if not on_board(col, row, self.player_boards[client].grid_size):
+                self.send(client, {"type": "ERROR", "message": "Shot is off the board."})
+                return True
+
+            attacker = self.clients[self.turn_index]
+            defender = self.clients[1 - self.turn_index]
+            defender_board = self.player_boards[defender]
+
+            result, is_sunk = defender_board.receive_shot(col, row)
+            if self.journal:
+                self.journal.shot(self.room_id, self.turn_index, col, row, result, defender_board.ships_sunk_count)
+            self.log(f"{player_name} fired at ({col},{row}). Result: {result}")
+
+            # Send result to attacker
+            self.send(attacker, {"type": "SHOT_RESULT", "col": col, "row": row, "result": result,
+                                 "sunk_count": defender_board.ships_sunk_count})
+            # Send notice to defender
+            self.send(defender, {"type": "OPPONENT_SHOT", "col": col, "row": row, "result": result,
+                                 "sunk_count": defender_board.ships_sunk_count})
+            shot_fired = {"type": "SHOT_FIRED", "player": player_name, "col": col, "row": row, "result": result,
+                          "sunk_count": defender_board.ships_sunk_count}
+
+            # Check for win
+            if defender_board.all_ships_sunk():
+                self.log(f"Game Over! {self.player_names[attacker]} wins!")
+                if self.journal:
+                    self.journal.end(self.room_id, self.turn_index)
+                self.game_state = "Over"
+                game_over = {"type": "GAME_OVER", "winner": self.player_names[attacker]}
+                self.send_to_all(game_over)
+                self.broadcast(shot_fired)
+                self.broadcast(game_over)
+                return False
+
+            # If it was a miss, switch turns
+            if result == 'Miss':
+                self.turn_index = 1 - self.turn_index  # Flip 0 to 1 or 1 to 0
+                self.send(self.clients[self.turn_index], {"type": "YOUR_TURN"})
+                self.send(self.clients[1 - self.turn_index], {"type": "OPPONENT_TURN"})
+                self.log(f"Turn switched. It is now {self.player_names[self.clients[self.turn_index]]}'s turn.")
+                self.broadcast(shot_fired)
+                self.broadcast({"type": "TURN", "player": self.player_names[self.clients[self.turn_index]]})
+            else:
+                self.broadcast(shot_fired)
+
+        return True
+
+    # --- Snapshots, Reattach and Resume ---
+    def snapshot(self):
+        """Copies everything needed to rebuild the room into plain JSON-able data."""
+        return {
+            "room_id": self.room_id,
+            "game_state": self.game_state,
+            "turn_index": self.turn_index,
+            "journal_run": self.journal.run if self.journal else None,
+            "players": [{
+                "name": self.player_names[client],
+                "token": self.tokens[client],
+                "placement_done": self.client_placement_done[client],
+                "ships": [dict(ship) for ship in self.player_boards[client].ships],
+                "grid": [list(row) for row in self.player_boards[client].grid],
+                "sent_count": self.sent_count[client],
+            } for client in self.clients],
+        }
+
+    @classmethod
+    def restore(cls, snapshot, verbose=True, journal=None):
+        """Rebuilds a room from snapshot(); every seat is detached until its player reattaches."""
+        if journal and snapshot.get('journal_run'):
+            journal = journal.resume(snapshot['journal_run'])  # Its START, placements and shots so far are there
+        room = cls(snapshot['room_id'], verbose, journal)
+        room.game_state = snapshot['game_state']
+        room.turn_index = snapshot['turn_index']
+        for player in snapshot['players']:
+            seat = DetachedSeat(room)
+            board = PlayerBoard(player['name'])
+            board.ships = player['ships']
+            board.grid = player['grid']
+            board.ships_placed_count = len(board.ships)
+            board.build_index()
+            room.clients.append(seat)
+            room.player_boards[seat] = board
+            room.player_names[seat] = player['name']
+            room.client_placement_done[seat] = player['placement_done']
+            room.tokens[seat] = player['token']
+            # The history itself is gone, so a RESUME from before the restart falls back to STATE
+            room.sent[seat] = deque(maxlen=RESUME_HISTORY)
+            room.sent_count[seat] = player.get('sent_count', 0)
+        return room
+
+    def seat_for(self, token):
+        """The connection (or DetachedSeat) holding a session token's seat, or None."""
+        for client, seat_token in self.tokens.items():
+            if seat_token == token:
+                return client
+        return None
+
+    def replace_client(self, old, new):
+        """Moves a seat, with its board and turn, from one connection to another."""
+        self.clients[self.clients.index(old)] = new
+        for seats in (self.player_boards, self.player_names, self.client_placement_done, self.tokens,
+                      self.sent, self.sent_count):
+            seats[new] = seats.pop(old)
+
+    def opponent_of(self, client):
+        for other in self.clients:
+            if other is not client:
+                return other
+        return None
+
+    def detach(self, client):
+        """Swaps a dropped connection for a DetachedSeat, keeping the game alive, and returns the seat."""
+        seat = DetachedSeat(self)
+        self.replace_client(client, seat)
+        self.log(f"{self.player_names[seat]} dropped; holding their seat.")
+        opponent = self.opponent_of(seat)
+        if opponent is not None and self.game_state != "Over":
+            self.send(opponent, {"type": "OPPONENT_AWAY", "grace": RESUME_GRACE})
+        return seat
+
+    def missed(self, client, last_seq):
+        """Messages sent to a seat after sequence number last_seq, or None if they are no longer kept."""
+        behind = self.sent_count[client] - last_seq
+        history = self.sent[client]
+        if behind < 0 or behind > len(history):
+            return None
+        return list(history)[len(history) - behind:]
+
+    def public_grid(self, client):
+        """A player's grid as their opponent sees it: only hits and misses, no unsunk ship positions."""
+        return [[cell if cell in ('H', 'M') else 0 for cell in row] for row in self.player_boards[client].grid]
+
+    def state_message(self, client):
+        """Everything a reattaching client needs to redraw its game; "shots" is the opponent's public_grid."""
+        board = self.player_boards[client]
+        opponent = self.opponent_of(client)
+        shots = self.public_grid(opponent) if opponent is not None else []
+        return {"type": "STATE", "name": self.player_names[client], "token": self.tokens[client],
+                "seq": self.sent_count[client],
+                "protocols": SUPPORTED_PROTOCOLS, "phase": self.game_state,
+                "placement_done": self.client_placement_done[client],
+                "turn": self.game_state == "Attack" and self.clients[self.turn_index] is client,
+                "ships": board.ships, "grid": board.grid, "shots": shots}
+
+    def spectator_state(self):
+        """What a new spectator sees first; "boards" are each player's public_grid, in seat order."""
+        return {"type": "SPECTATING", "room": self.room_id, "phase": self.game_state,
+                "players": [self.player_names[client] for client in self.clients],
+                "ready": [self.client_placement_done[client] for client in self.clients],
+                "turn": self.player_names[self.clients[self.turn_index]] if self.game_state == "Attack" else None,
+                "boards": [self.public_grid(client) for client in self.clients],
+                "sunk": [self.player_boards[client].ships_sunk_count for client in self.clients]}
 
-            # Read full message
-            data = b''
-            while len(data) < msg_len:
-                packet = client_socket.recv(msg_len - len(data))
-                if not packet:
+
+# --- Matchmaking Lobby ---
+class Lobby:
+    """FIFO queue of connections waiting for an opponent.
+
+    Waiters live in an OrderedDict, so joining, leaving and popping the
+    oldest waiter are all O(1) however many connections are queued.
+    """
+
+    def __init__(self):
+        self.waiting = OrderedDict()  # connection -> time it joined
+        self.paired_count = 0
+        self.total_wait = 0.0
+
+    def join(self, client, compatible=None):
+        """Queues a client. Returns a (first, second) pair once two are waiting.
+
+        With `compatible`, the client is paired with the oldest waiter for
+        which compatible(waiter, client) is true rather than simply the oldest.
+        """
+        now = time.monotonic()
+        if compatible is None:
+            opponent = next(iter(self.waiting), None)
+        else:
+            opponent = next((waiter for waiter in self.waiting if compatible(waiter, client)), None)
+        if opponent is None:
+            self.waiting[client] = now
+            return None
+
+        joined = self.waiting.pop(opponent)
+        self.paired_count += 2
+        self.total_wait += now - joined  # The newcomer did not wait at all
+        return opponent, client
+
+    def leave(self, client):
+        """Drops a client that disconnected before being paired."""
+        self.waiting.pop(client, None)
+
+    def queue_depth(self):
+        return len(self.waiting)
+
+    def average_wait(self):
+        """Average seconds a paired player spent in the queue."""
+        return self.total_wait / self.paired_count if self.paired_count else 0.0
+
+    def stats(self):
+        return {"queue_depth": self.queue_depth(), "average_wait": round(self.average_wait(), 3)}
+
+
+# --- Server Core ---
+class GameServer:
+    """Lobby and room bookkeeping shared by the threaded and asyncio servers."""
+
+    def __init__(self, verbose=True, journal=None, store=None, limits=None):
+        self.verbose = verbose
+        self.journal = journal
+        self.store = store
+        self.limits = limits or SendLimits()
+        self.connections = set()  # Every open client connection, for send queue checks and metrics
+        self.lobby = Lobby()
+        self.rooms = {}  # room_id -> GameRoom
+        self.room_ids = itertools.count(1)
+        self.sessions = {}  # session token -> GameRoom
+        self.carried = {}  # connection back in the lobby -> (token, sent_count) from its dissolved room
+        self.detached = {}  # DetachedSeat -> time.monotonic() after which it forfeits
+        self.dirty = set()  # Rooms changed since the last checkpoint
+        self.removed = []  # Ids of rooms closed since the last checkpoint
+        self.batch = WriteBatch()  # Shared by every connection; see dispatch_frames
+
+        self.metrics = ServerMetrics()
+        self.metrics.gauge('battleship_rooms', "Rooms with at least one player still connected.",
+                           lambda: len(self.rooms))
+        self.metrics.gauge('battleship_games_in_progress', "Rooms in the placement or attack phase.",
+                           self.games_in_progress)
+        self.metrics.gauge('battleship_lobby_queue_depth', "Connections waiting for an opponent.",
+                           lambda: self.lobby.queue_depth())  # Late-bound: cluster.py workers swap the lobby
+        self.metrics.gauge('battleship_spectators', "Connections watching a game.",
+                           lambda: sum(len(room.spectators) for room in list(self.rooms.values())))
+        self.metrics.gauge('battleship_send_queue_bytes', "Bytes queued for clients that have not taken them.",
+                           lambda: sum(connection.backlog() for connection in list(self.connections)))
+        self.metrics.gauge('battleship_send_queue_max_bytes', "The largest single connection's send queue.",
+                           lambda: max((connection.backlog() for connection in list(self.connections)), default=0))
+        self.metrics.gauge('battleship_connections_throttled', "Connections over the high watermark, reads paused.",
+                           lambda: sum(1 for connection in list(self.connections)
+                                       if connection.backlog() > self.limits.high))
+
+    def games_in_progress(self):
+        return sum(1 for room in list(self.rooms.values()) if room.game_state in ("Placement", "Attack"))
+
+    def connect(self, client):
+        """Puts a new connection in the lobby and opens a room when it completes a pair."""
+        self.metrics.connections_opened += 1
+        self.connections.add(client)
+        with self.batch:
+            self.enqueue(client)
+
+    def enqueue(self, client):
+        pair = self.lobby.join(client)
+        if pair is None:
+            client.send({"type": "LOBBY", "message": "Waiting for an opponent...", **self.lobby.stats()})
+            return
+        self.open_room(pair)
+
+    def open_room(self, pair):
+        room = GameRoom(next(self.room_ids), verbose=self.verbose, journal=self.journal)
+        self.rooms[room.room_id] = room
+        for player in pair:
+            player.room = room
+            room.add_player(player, *self.carried.pop(player, (None, 0)))
+        for token in room.tokens.values():
+            self.sessions[token] = room
+        self.mark_dirty(room)
+        return room
+
+    def mark_dirty(self, room):
+        if self.store is not None:
+            self.dirty.add(room)
+
+    def dispatch(self, client, message):
+        """Routes a message to the client's room. Returns False when the connection should close."""
+        self.metrics.record_receive(message)
+        msg_type = message.get('type')
+        if msg_type == 'HELLO':
+            # Protocol negotiation, answered to the GREETING's "protocols" list
+            if message.get('protocol') in SUPPORTED_PROTOCOLS:
+                client.protocol = message['protocol']
+            return True
+        if msg_type == 'REATTACH':
+            self.reattach(client, message.get('token'))
+            return True
+        if msg_type == 'RESUME':
+            self.resume(client, message.get('token'), message.get('seq', 0))
+            return True
+        if msg_type == 'SPECTATE':
+            self.spectate(client, message.get('room'))
+            return True
+        if client.room is None:
+            return True  # Still in the lobby; nothing to act on yet
+        self.mark_dirty(client.room)
+        if msg_type != 'SHOT':
+            return client.room.handle_message(client, message)
+
+        start = time.perf_counter()
+        keep_open = client.room.handle_message(client, message)
+        self.metrics.shot_latency.observe(time.perf_counter() - start)
+        if not keep_open:
+            self.metrics.games_finished += 1
+        # The winner closes their own connection after GAME_OVER, like the loser: hanging up
+        # here would free the seat before a connection dropped in the meantime could RESUME it
+        return True
+
+    def dispatch_frames(self, client):
+        """Dispatches every complete frame the client's decoder holds. Returns False to close.
+
+        Everything the frames cause is sent as one write per recipient: a
+        missed SHOT reaches each player as one SHOT_RESULT or OPPONENT_SHOT
+        frame followed by its turn frame, in a single packet.
+        """
+        with self.batch:
+            for payload in client.decoder.frames():
+                if not self.dispatch(client, decode_message(payload)):
+                    return False
+        return True
+
+    def disconnect(self, client):
+        """Removes a connection from the lobby or from its room."""
+        self.metrics.connections_closed += 1
+        self.connections.discard(client)
+        self.leave(client)
+
+    def leave(self, client):
+        if client.watching is not None:
+            client.watching.remove_spectator(client)
+        room = client.room
+        if room is None:
+            self.lobby.leave(client)
+            self.carried.pop(client, None)
+            return
+        if client.lost and room.game_state in ("Placement", "Attack", "Over"):
+            # Held after the end too, in case GAME_OVER went down with the connection;
+            # expire_detached forfeits or clears the seat later
+            self.detached[room.detach(client)] = time.monotonic() + RESUME_GRACE
+            self.mark_dirty(room)
+            return
+        room.remove_player(client)
+        if room.clients:
+            self.mark_dirty(room)
+        else:
+            self.close_room(room)
+
+    def close_room(self, room):
+        self.rooms.pop(room.room_id, None)
+        if room.spectators and room.game_state != "Over":
+            room.broadcast({"type": "GAME_OVER", "winner": None, "message": "The game was called off."})
+        for spectator in list(room.spectators):
+            room.remove_spectator(spectator)  # They saw GAME_OVER; a new SPECTATE picks another game
+        for token in room.tokens.values():
+            self.sessions.pop(token, None)
+        if self.store is not None:
+            self.dirty.discard(room)
+            self.removed.append(room.room_id)
+
+    # --- Reattach, Resume and Warm Restart ---
+    def claim_seat(self, client, token, allow_over=False):
+        """Checks a session token and clears the way for `client` to take its seat.
+
+        Returns (room, seat), or None after telling the client why not.
+        """
+        room = self.sessions.get(token)
+        seat = room.seat_for(token) if room is not None else None
+        if seat is not None and client.room is room and seat is not client:
+            # The lobby paired this connection with its own dead predecessor: there is no game to rejoin
+            self.close_room(room)
+            self.detached.pop(seat, None)
+            client.room = None
+            seat = None
+        if room is None:
+            self.forget_carried(token)
+        if seat is None or not (room.game_state in ("Placement", "Attack") or allow_over):
+            client.send({"type": "RESUME_FAILED", "message": "No game in progress for that session."})
+            # Carry on as a new player, rather than hold up the partner of a fresh pairing
+            self.release(client)
+            self.carried.pop(client, None)  # The client starts its numbering over too
+            self.enqueue(client)
+            return None
+        if client.room is not room and client.room is not None and client.room.client_placement_done[client]:
+            client.send({"type": "RESUME_FAILED", "message": "Already playing another game."})
+            return None
+        if client.room is not room:
+            self.release(client)
+        return room, seat
+
+    def forget_carried(self, token):
+        """Takes the connection a dissolved room sent back to the lobby under `token` out of it.
+
+        Its player is resuming from another connection, so this one is dead
+        and must not be paired with anyone.
+        """
+        for connection, (carried_token, _) in list(self.carried.items()):
+            if carried_token == token:
+                del self.carried[connection]
+                self.lobby.leave(connection)
+
+    def take_seat(self, client, room, seat):
+        """Moves a seat to a new connection, from a DetachedSeat or an old connection still open."""
+        if seat is client:
+            return
+        room.replace_client(seat, client)
+        client.room = room
+        seat.room = None  # If an old connection closes later, it no longer owns the seat
+        seat.shutdown()
+        room.log(f"{room.player_names[client]} is back.")
+        if self.detached.pop(seat, None) is not None:
+            opponent = room.opponent_of(client)
+            if opponent is not None and room.game_state != "Over":
+                room.send(opponent, {"type": "OPPONENT_BACK"})
+        self.mark_dirty(room)
+
+    def reattach(self, client, token):
+        """Moves a connection into the seat its session token names and sends it the full game state."""
+        claimed = self.claim_seat(client, token)
+        if claimed is None:
+            return
+        room, seat = claimed
+        self.take_seat(client, room, seat)
+        client.send(room.state_message(client))
+
+    def resume(self, client, token, last_seq):
+        """Like reattach, but replays only the messages after last_seq instead of the whole state.
+
+        Falls back to STATE when the seat's history no longer reaches back
+        that far (e.g. after a restart).
+        """
+        claimed = self.claim_seat(client, token, allow_over=True)
+        if claimed is None:
+            return
+        room, seat = claimed
+        missed = room.missed(seat, last_seq)
+        if missed is None and room.game_state == "Over":
+            client.send({"type": "RESUME_FAILED", "message": "That game is over."})
+            if client.room is None:
+                self.carried.pop(client, None)
+                self.enqueue(client)
+            return
+        self.take_seat(client, room, seat)
+        if missed is None:
+            client.send(room.state_message(client))
+            return
+        client.send({"type": "RESUMED", "seq": room.sent_count[client], "messages": missed,
+                     "protocols": SUPPORTED_PROTOCOLS, "phase": room.game_state,
+                     "placement_done": room.client_placement_done[client],
+                     "turn": room.game_state == "Attack" and room.clients[room.turn_index] is client})
+
+    def release(self, client):
+        """Undoes the lobby place or fresh pairing a resuming connection got on connect.
+
+        A partner it was just paired with goes back through the lobby; it
+        has at most seen GREETING and START_PLACEMENT, and sees them again
+        from its next room, under the same token and numbering in case it
+        too has to RESUME before the new GREETING reaches it.
+        """
+        if client.watching is not None:
+            client.watching.remove_spectator(client)
+        room = client.room
+        if room is None:
+            self.lobby.leave(client)
+            return
+        self.close_room(room)
+        client.room = None
+        for partner in room.clients:
+            if partner is client:
+                continue
+            partner.room = None
+            if isinstance(partner, DetachedSeat):
+                self.detached.pop(partner, None)  # Dropped already; its RESUME will find no game
+                continue
+            self.carried[partner] = (room.tokens[partner], room.sent_count[partner])
+            self.enqueue(partner)
+
+    # --- Spectators ---
+    def spectate(self, client, room_id=None):
+        """Makes a connection a spectator of a game in progress: the given room, or else the oldest game.
+
+        It leaves the lobby (or a pairing too fresh to have placed ships) for
+        good, even if there is no game to watch yet and it has to ask again;
+        a connection already playing is refused.
+        """
+        if client.room is not None and client.room.client_placement_done[client]:
+            client.send({"type": "SPECTATE_FAILED", "message": "Already playing a game."})
+            return
+        self.release(client)
+        self.carried.pop(client, None)
+        if room_id is None:
+            room = next((room for room in self.rooms.values() if room.game_state in ("Placement", "Attack")), None)
+        else:
+            room = self.rooms.get(room_id)
+        if room is None or room.game_state not in ("Placement", "Attack"):
+            client.send({"type": "SPECTATE_FAILED", "message": "No such game in progress."})
+            return
+        room.add_spectator(client)
+
+    def restore_rooms(self):
+        """Reloads every room the store still holds; their players reattach with their tokens."""
+        snapshots = self.store.load()
+        deadline = time.monotonic() + REATTACH_GRACE
+        for snapshot in snapshots:
+            room = GameRoom.restore(snapshot, self.verbose, self.journal)
+            self.rooms[room.room_id] = room
+            for seat in room.clients:
+                self.sessions[room.tokens[seat]] = room
+                self.detached[seat] = deadline
+        if snapshots:
+            self.room_ids = itertools.count(max(self.rooms) + 1)
+        return len(snapshots)
+
+    def expire_detached(self):
+        """Forfeits seats whose players did not come back in time."""
+        now = time.monotonic()
+        for seat, deadline in list(self.detached.items()):
+            if now >= deadline:
+                del self.detached[seat]
+                if seat.room is not None:
+                    self.leave(seat)
+
+    def check_send_queues(self):
+        """Disconnects clients that have been over the high watermark for too long without a new write."""
+        for connection in list(self.connections):
+            connection.check_backlog()
+
+    def take_checkpoint(self):
+        """Snapshots the rooms changed since the last call; cheap enough to run under the lock."""
+        snapshots = [room.snapshot() for room in self.dirty]
+        removed, self.dirty, self.removed = self.removed, set(), []
+        return snapshots, removed
+
+    def status_line(self):
+        stats = self.lobby.stats()
+        return (f"[SERVER] Rooms: {len(self.rooms)} | Lobby queue: {stats['queue_depth']} | "
+                f"Average wait: {stats['average_wait']}s")
+
+
+# --- Threaded Server (one thread per client) ---
+class ThreadedServer(GameServer):
+    """Serves each client from its own OS thread; one lock guards lobby and rooms."""
+
+    def __init__(self, verbose=True, journal=None, store=None, limits=None):
+        super().__init__(verbose, journal, store, limits)
+        self.lock = threading.Lock()
+
+    def handle_client(self, client):
+        """Handles messages from a single client in a thread."""
+        while True:
+            try:
+                if not client.wait_writable():
                     break
-                data += packet
-
-            message = json.loads(data.decode('utf-8'))
-            msg_type = message.get('type')
-
-            if msg_type == 'PLACEMENT_DONE':
-                # Client sent their board
-                player_boards[client_socket].ships = message['ships']
-                player_boards[client_socket].grid = message['grid']
-                client_placement_done[client_socket] = True
-                print(f"[SERVER] {player_name} has finished placement.")
-
-                # Check if all players are done
-                if all(client_placement_done.values()):
-                    game_state = "Attack"
-                    turn_index = 0  # Player 1 (first to connect) goes first
-                    attacker = clients[turn_index]
-                    defender = clients[1 - turn_index]
-
-                    print("[SERVER] All players ready. Starting attack phase.")
-                    send_to_client(attacker,
-                                   {"type": "START_ATTACK", "turn": True, "message": "Your turn! Fire a shot."})
-                    send_to_client(defender, {"type": "START_ATTACK", "turn": False, "message": "Opponent's turn."})
-
-            elif msg_type == 'SHOT':
-                if game_state != "Attack" or client_socket != clients[turn_index]:
-                    send_to_client(client_socket,
-                                   {"type": "ERROR", "message": "Not your turn or game not in Attack phase."})
-                    continue
-
-                col, row = message['col'], message['row']
-                attacker = clients[turn_index]
-                defender = clients[1 - turn_index]
-                defender_board = player_boards[defender]
-
-                result, is_sunk = defender_board.receive_shot(col, row)
-                print(f"[SERVER] {player_name} fired at ({col},{row}). Result: {result}")
-
-                # Send result to attacker
-                send_to_client(attacker, {"type": "SHOT_RESULT", "col": col, "row": row, "result": result,
-                                          "sunk_count": defender_board.ships_sunk_count})
-                # Send notice to defender
-                send_to_client(defender, {"type": "OPPONENT_SHOT", "col": col, "row": row, "result": result,
-                                          "sunk_count": defender_board.ships_sunk_count})
-
-                # Check for win
-                if defender_board.ships_sunk_count == len(SHIP_SIZES):
-                    print(f"[SERVER] Game Over! {player_names[attacker]} wins!")
-                    send_to_all({"type": "GAME_OVER", "winner": player_names[attacker]})
-                    game_state = "Waiting"  # Reset for new game?
+                received = client.decoder.recv_into(client.sock)
+                if not received:
                     break
+                self.metrics.bytes_in += received
+                with self.lock:
+                    if not self.dispatch_frames(client):
+                        break
+
+            except Exception as e:
+                print(f"[SERVER] Error handling client: {e}")
+                client.lost = True
+                break
+
+        # Cleanup on disconnect
+        with self.lock:
+            self.disconnect(client)
+        client.close()
+
+    def report_status(self, interval):
+        while True:
+            time.sleep(interval)
+            with self.lock:
+                print(self.status_line())
+
+    def housekeeping(self, interval):
+        """Forfeits expired seats, and copies dirty rooms under the lock to write them to SQLite without it."""
+        while True:
+            time.sleep(interval)
+            with self.lock:
+                self.expire_detached()
+                self.check_send_queues()
+                snapshots, removed = self.take_checkpoint()
+            if snapshots or removed:
+                self.store.save(snapshots, removed)
+
+    def serve(self, host, port, report_interval):
+        server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.bind((host, port))
+        server_socket.listen(BACKLOG)
+
+        if report_interval:
+            threading.Thread(target=self.report_status, args=(report_interval,), daemon=True).start()
+        threading.Thread(target=self.housekeeping, args=(CHECKPOINT_INTERVAL,), daemon=True).start()
+
+        while True:
+            client_socket, addr = server_socket.accept()
+            print(f"[SERVER] Client connected from {addr}")
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Every write is a whole batch
+            client = SocketConnection(client_socket, self.metrics, self.batch, self.limits)
+            with self.lock:
+                self.connect(client)
+
+            thread = threading.Thread(target=self.handle_client, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+
+# --- Asyncio Server (many games per process) ---
+class AsyncServer(GameServer):
+    """Hosts any number of concurrent GameRooms on one asyncio event loop."""
+
+    def __init__(self, verbose=False, journal=None, store=None, limits=None):
+        super().__init__(verbose, journal, store, limits)
+
+    async def handle_connection(self, reader, writer):
+        """Serves one client for the lifetime of its connection."""
+        client = StreamConnection(reader, writer, self.metrics, self.batch, self.limits)  # asyncio sets TCP_NODELAY
+        self.connect(client)
+        await self.serve_connection(client)
 
-                # If it was a miss, switch turns
-                if result == 'Miss':
-                    turn_index = 1 - turn_index  # Flip 0 to 1 or 1 to 0
-                    send_to_client(clients[turn_index], {"type": "YOUR_TURN"})
-                    send_to_client(clients[1 - turn_index], {"type": "OPPONENT_TURN"})
-                    print(f"[SERVER] Turn switched. It is now {player_names[clients[turn_index]]}'s turn.")
+    async def serve_connection(self, client):
+        """Reads and dispatches a connection's frames, starting with any its decoder already holds.
 
+        Reading stops while the client's send queue is over the high
+        watermark, and a full read yields to the other connections before
+        the next: a client that floods requests gets one buffer's worth of
+        them handled per turn of the event loop.
+        """
+        try:
+            while True:
+                keep_open = self.dispatch_frames(client)
+                await client.writer.drain()
+                if not keep_open:
+                    break
+                data = await client.reader.read(READ_BUFFER_SIZE)
+                if not data:
+                    break
+                self.metrics.bytes_in += len(data)
+                client.decoder.feed(data)
+                if len(data) == READ_BUFFER_SIZE:
+                    await asyncio.sleep(0)  # More is probably buffered, and read() would return it without yielding
         except Exception as e:
-            print(f"[SERVER] Error handling client {player_name}: {e}")
-            break
+            print(f"[SERVER] Error handling client: {e}")
+            client.lost = True
+        finally:
+            self.disconnect(client)
+            client.close()
 
-    # Cleanup on disconnect
-    print(f"[SERVER] {player_name} disconnected.")
-    clients.remove(client_socket)
-    del player_boards[client_socket]
-    del player_names[client_socket]
-    del client_placement_done[client_socket]
-    client_socket.close()
+    async def report_status(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.status_line())
 
+    async def housekeeping(self, interval):
+        """Forfeits expired seats, and copies dirty rooms on the loop to write them to SQLite on a worker thread."""
+        while True:
+            await asyncio.sleep(interval)
+            self.expire_detached()
+            self.check_send_queues()
+            snapshots, removed = self.take_checkpoint()
+            if snapshots or removed:
+                await asyncio.to_thread(self.store.save, snapshots, removed)
+
+    async def serve(self, host, port, report_interval):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=BACKLOG)
+        if report_interval:
+            asyncio.create_task(self.report_status(report_interval))
+        asyncio.create_task(self.housekeeping(CHECKPOINT_INTERVAL))
+        async with server:
+            await server.serve_forever()
 
-def main():
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    server_socket.bind((HOST, PORT))
-    server_socket.listen(MAX_PLAYERS)
 
+def print_banner(port):
     try:
         my_ip = socket.gethostbyname(socket.gethostname())
         print(f"*** Battleship Server Started ***")
         print(f"Share this IP with your opponent: {my_ip}")
-        print(f"Listening on port {PORT}...")
+        print(f"Listening on port {port}...")
     except:
         print(f"*** Battleship Server Started ***")
-        print(f"Listening on {HOST}:{PORT}... (Could not determine local IP)")
+        print(f"Listening on {HOST}:{port}... (Could not determine local IP)")
 
-    while True:
-        if len(clients) < MAX_PLAYERS:
-            client_socket, addr = server_socket.accept()
-            clients.append(client_socket)
-            player_name = f"Player {len(clients)}"
-            print(f"[SERVER] {player_name} connected from {addr}")
 
-            thread = threading.Thread(target=handle_client, args=(client_socket, player_name))
-            thread.daemon = True
-            thread.start()
+def add_send_options(parser):
+    """The send queue options, shared with cluster.py."""
+    parser.add_argument('--send-high', type=int, default=SEND_HIGH_WATER, metavar='BYTES',
+                        help="Queued bytes at which a client's reads pause and a spectator is dropped.")
+    parser.add_argument('--send-low', type=int, default=SEND_LOW_WATER, metavar='BYTES',
+                        help="Queued bytes at which paused reads resume.")
+    parser.add_argument('--send-limit', type=int, default=SEND_LIMIT, metavar='BYTES',
+                        help="Queued bytes at which a player is disconnected as a slow consumer.")
+    parser.add_argument('--slow-timeout', type=float, default=SLOW_CONSUMER_TIMEOUT, metavar='SECONDS',
+                        help="Seconds a client may stay over --send-high before it is disconnected.")
+
+
+def send_limits(parser, args):
+    if not 0 <= args.send_low <= args.send_high <= args.send_limit:
+        parser.error("expected --send-low <= --send-high <= --send-limit")
+    return SendLimits(args.send_high, args.send_low, args.send_limit, args.slow_timeout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Battleship game server.")
+    parser.add_argument('--mode', choices=['threaded', 'async'], default='threaded',
+                        help="'threaded' uses one thread per client; 'async' runs every game on one event loop.")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--verbose', action='store_true', help="Log every move in async mode.")
+    parser.add_argument('--report-interval', type=float, default=60,
+                        help="Seconds between room/lobby status lines (0 disables).")
+    parser.add_argument('--metrics-port', type=int, default=0,
+                        help=f"Serve Prometheus metrics at http://{METRICS_HOST}:PORT/metrics (0 disables).")
+    parser.add_argument('--journal', metavar='DIR', help="Record every game's events to segment files in DIR.")
+    parser.add_argument('--state-db', metavar='PATH',
+                        help="Checkpoint rooms to this SQLite file and resume them after a restart.")
+    add_send_options(parser)
+    args = parser.parse_args()
+    limits = send_limits(parser, args)
+
+    print_banner(args.port)
+    journal = Journal(args.journal) if args.journal else None
+    store = RoomStore(args.state_db) if args.state_db else None
+    if args.mode == 'async':
+        server = AsyncServer(verbose=args.verbose, journal=journal, store=store, limits=limits)
+    else:
+        server = ThreadedServer(journal=journal, store=store, limits=limits)
+    if store is not None:
+        print(f"Restored {server.restore_rooms()} game(s) from {args.state_db}")
+    if args.metrics_port:
+        serve_metrics(server.metrics, METRICS_HOST, args.metrics_port)
+        print(f"Metrics at http://{METRICS_HOST}:{args.metrics_port}/metrics")
+    try:
+        if args.mode == 'async':
+            asyncio.run(server.serve(args.host, args.port, args.report_interval))
         else:
-            # Simple way to prevent more connections
-            time.sleep(1)
+            server.serve(args.host, args.port, args.report_interval)
+    finally:
+        if journal:
+            journal.close()
+        if store is not None:
+            store.save(*server.take_checkpoint())
+            store.close()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()